@@ -3,7 +3,8 @@ import matplotlib.pyplot as plt
 from matplotlib import font_manager, rc  # 한글 폰트 설정
 import matplotlib.ticker as ticker
 import pandas as pd
-from sklearn.linear_model import LinearRegression
+from box_model import simulate
+from trend import predict_future_values
 
 # 한글 폰트 설정 (예: 나눔고딕)
 font_path = 'C:/Windows/Fonts/NanumGothic.ttf'  # 폰트 경로 설정
@@ -54,27 +55,12 @@ dt = 1
 # 연도 설정
 years = np.arange(2012, 2012 + time).reshape(-1, 1)
 
-# 각 변수에 대해 선형 회귀 모델을 피팅하고 미래 값 예측
-def predict_future_values(y_values, years, future_years):
-    model = LinearRegression()
-    model.fit(years, y_values)
-    future_years = np.array(future_years).reshape(-1, 1)
-    return model.predict(future_years)
-
 # 미래 예측을 위한 연도들
 future_years = [2012 + time, 2012 + time + 1]  # 2024, 2025년
 
-# Qin 예측
-predicted_Qin = predict_future_values(Qin, years, future_years)
-
-# Qout 예측
-predicted_Qout = predict_future_values(Qout, years, future_years)
-
-# P 예측 (출생아수)
-predicted_P = predict_future_values(P, years, future_years)
-
-# D 예측 (사망자수)
-predicted_D = predict_future_values(D, years, future_years)
+# Qin, Qout, P(출생아수), D(사망자수) 의 선형 추세를 한 번에 피팅하고 미래 값 예측
+predicted_Qin, predicted_Qout, predicted_P, predicted_D = predict_future_values(
+    np.vstack([Qin, Qout, P, D]), years, future_years)
 
 # ======================================
 # 예측된 값들을 데이터프레임에 추가
@@ -99,11 +85,7 @@ time = len(df)
 # ======================================
 # 1D 박스 모델
 # ======================================
-dC = np.zeros(time)
-dC[0] = C0
-
-for t in range(1, time):
-    dC[t] = dC[t-1] + (Qin[t-1] - Qout[t-1] + P[t-1] - D[t-1]) * dt
+dC = simulate(C0, Qin, Qout, P, D, dt)  # 초기 인구 C0 에서 누적 적분
 
 # ======================================
 # 실제 인구수 계산
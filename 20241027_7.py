@@ -3,6 +3,7 @@ import matplotlib.pyplot as plt
 from matplotlib import font_manager, rc  # 한글 폰트 설정
 import matplotlib.ticker as ticker
 import pandas as pd
+from box_model import simulate
 
 # 한글 폰트 설정 (예: 나눔고딕)
 font_path = 'C:/Windows/Fonts/NanumGothic.ttf'  # 폰트 경로 설정
@@ -58,11 +59,7 @@ dt = 1
 # ======================================
 # 1D 박스 모델
 # ======================================
-dC = np.zeros(time)
-dC[0] = C0
-
-for t in range(1, time):
-    dC[t] = dC[t-1] + (Qin[t-1] - Qout[t-1] + P[t-1] - D[t-1]) * dt
+dC = simulate(C0, Qin, Qout, P, D, dt)  # 초기 인구 C0 에서 누적 적분
 
 # ======================================
 # 실제 인구수 계산
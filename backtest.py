@@ -0,0 +1,102 @@
+import numpy as np
+
+from box_model import net_flux, observed_population
+
+# ======================================
+# 모든 보정 구간에 대한 백테스트
+# ======================================
+# 20241027_7.py 는 2018~2023년 구간 하나만 골라 C0 = new_dC[2018] 로 다시 적분한 뒤
+# MAE/RMSE/MAPE 를 계산했다. 시작 연도 s 에서 시작한 모델은
+#     dC[t] = new_dC[s] + S[t] - S[s],   S[t] = dt * Σ_{k<t} flux[k]
+# 이므로 오차는 e[s, t] = dC[t] - new_dC[t] = G[s] - G[t] (G = new_dC - S) 로 쓸 수 있다.
+#
+# - 편향(bias), RMSE, 마지막 해 오차: G 와 G² 의 누적합으로 구간마다 O(1)
+# - MAE, MAPE, 최대 오차: 시작 연도별로 |G[s] - G[t]| 를 t 방향 누적하여
+#   모든 끝 연도를 한꺼번에 구하므로 구간당 평균 O(1)
+#
+# 결과는 [시작 인덱스, 끝 인덱스] 로 접근하는 (n, n) 배열이며 끝 < 시작 인 칸은 NaN.
+# 예측 기간(horizon) = 끝 - 시작.
+
+METRICS = ('MAE', 'RMSE', 'MAPE', 'bias', 'max_error', 'last_error', 'last_error_rate')
+
+
+def window_offsets(Qin, Qout, P, D, observed, dt=1):
+    """G = new_dC - S (모든 구간의 오차가 G[s] - G[t] 로 표현됨)."""
+    flux = net_flux(Qin, Qout, P, D)
+    S = np.zeros(len(flux))
+    np.cumsum(flux[:-1] * dt, out=S[1:])
+    return np.asarray(observed, dtype=float) - S
+
+
+def backtest(Qin, Qout, P, D, observed, dt=1, block=256):
+    """모든 (시작, 끝) 구간의 평가 지표를 계산한다. 반환값은 {지표 이름: (n, n) 배열}."""
+    observed = np.asarray(observed, dtype=float)
+    G = window_offsets(Qin, Qout, P, D, observed, dt)
+    G = G - G.mean()  # 오차는 G 의 차이로만 정해지므로 중심화해 제곱합의 상쇄 오차를 줄임
+    n = len(G)
+
+    s = np.arange(n)[:, np.newaxis]
+    e = np.arange(n)[np.newaxis, :]
+    valid = e >= s
+    m = np.where(valid, e - s + 1, 1).astype(float)
+
+    # 누적합 기반 O(1) 지표
+    PG = np.concatenate([[0.0], np.cumsum(G)])
+    PG2 = np.concatenate([[0.0], np.cumsum(G ** 2)])
+    sum_G = PG[e + 1] - PG[s]
+    sum_G2 = PG2[e + 1] - PG2[s]
+    Gs = G[:, np.newaxis]
+    sq = np.maximum(m * Gs ** 2 - 2 * Gs * sum_G + sum_G2, 0.0)
+
+    result = {
+        'RMSE': np.sqrt(sq / m),
+        'bias': Gs - sum_G / m,
+        'last_error': Gs - G[np.newaxis, :],
+    }
+    result['last_error_rate'] = result['last_error'] / observed * 100
+
+    # 절대값 기반 지표: 시작 연도 block 개씩 행 단위 누적
+    result['MAE'] = np.empty((n, n))
+    result['MAPE'] = np.empty((n, n))
+    result['max_error'] = np.empty((n, n))
+    for lo in range(0, n, block):
+        hi = min(lo + block, n)
+        err = np.abs(G[lo:hi, np.newaxis] - G[np.newaxis, :])
+        err[~valid[lo:hi]] = 0.0
+        result['max_error'][lo:hi] = np.maximum.accumulate(err, axis=1)
+        result['MAE'][lo:hi] = np.cumsum(err, axis=1) / m[lo:hi]
+        err /= observed
+        result['MAPE'][lo:hi] = np.cumsum(err, axis=1) / m[lo:hi] * 100
+
+    for values in result.values():
+        values[~valid] = np.nan
+    return result
+
+
+def best_window(result, metric='RMSE', min_years=2):
+    """지표가 가장 작은 (시작 인덱스, 끝 인덱스) 를 찾는다. 구간 길이는 min_years 이상."""
+    if metric not in METRICS:
+        raise ValueError(f"알 수 없는 지표: {metric} ({', '.join(METRICS)})")
+    values = np.abs(result[metric])
+    n = len(values)
+    too_short = np.arange(n)[np.newaxis, :] - np.arange(n)[:, np.newaxis] + 1 < min_years
+    values = np.where(too_short, np.nan, values)
+    return np.unravel_index(np.nanargmin(values), values.shape)
+
+
+if __name__ == '__main__':
+    from data_cache import load_table_2023
+
+    # ======================================
+    # 데이터 읽기 (2023년 데이터 포함)
+    # ======================================
+    table = load_table_2023()
+    Qin, Qout, P, D = table['Qin'], table['Qout'], table['P'], table['D']
+
+    new_dC = observed_population(table['male'], table['female'], Qin, Qout, P, D)
+    result = backtest(Qin, Qout, P, D, new_dC)
+    years = table['year']
+
+    for metric in ('MAE', 'RMSE', 'MAPE'):
+        s, e = best_window(result, metric, min_years=3)
+        print(f"{metric} 최소 구간: {years[s]}~{years[e]}년 ({result[metric][s, e]:.2f})")
@@ -0,0 +1,261 @@
+import argparse
+import functools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from box_model import simulate
+from metrics import ErrorAccumulator
+from trend import predict_future_values
+
+# ======================================
+# 성능 측정 (벤치마크)
+# ======================================
+# 사용법:
+#     python bench.py                              # 기본 크기, 결과를 bench_results.json 에 저장
+#     python bench.py --sizes tiny small --repeat 5
+#     python bench.py --baseline bench_baseline.json   # 기준 결과와 비교 (느려지면 종료 코드 1)
+#     python bench.py --save-baseline bench_baseline.json
+#
+# 측정 대상: 박스 모델 적분, 선형 추세 예측, MAE/RMSE/MAPE 계산(개별 식 / 누적기), CSV 읽기.
+# 크기는 (시간 스텝 수, 시나리오 수) 이며, 메모리에 다 올릴 수 없는 크기는
+# 시나리오를 나누어 처리한 전체 시간을 잰다. 입력은 고정 시드로 생성한다.
+
+SIZES = {
+    'tiny': (11, 1),           # 현재 자료 (2012~2022년)
+    'small': (100, 100),
+    'medium': (10_000, 1_000),
+    'large': (100_000, 10_000),
+    'huge': (1_000_000, 10_000),
+}
+
+BLOCK_ELEMENTS = 1 << 22  # 한 번에 처리할 최대 원소 수 (시간 × 시나리오)
+LOOP_LIMIT = 100_000      # 기존 반복문 방식은 이 크기까지만 측정
+
+
+def _inputs(time_steps, scenarios, seed=0):
+    rng = np.random.default_rng(seed)
+    base = np.array([1.5e6, 1.6e6, 7e4, 4.5e4])
+    flux = base[:, np.newaxis, np.newaxis] * rng.uniform(0.9, 1.1, (4, scenarios, time_steps))
+    return flux
+
+
+def _blocks(time_steps, scenarios):
+    step = max(1, BLOCK_ELEMENTS // time_steps)
+    for lo in range(0, scenarios, step):
+        yield min(step, scenarios - lo)
+
+
+def _timeit(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+# ======================================
+# 측정 항목
+# ======================================
+def bench_simulate(time_steps, scenarios, mode='float64'):
+    blocks = list(_blocks(time_steps, scenarios))
+    flux = _inputs(time_steps, blocks[0])
+    # 입력도 해당 자료형으로 준비해 변환 비용이 아닌 적분 비용을 잰다
+    flux = np.rint(flux).astype(np.int64) if mode == 'int64' else flux.astype(mode)
+
+    def run():
+        for n in blocks:
+            simulate(10_000_000, flux[0, :n], flux[1, :n], flux[2, :n], flux[3, :n], mode=mode)
+    return run
+
+
+def bench_simulate_loop(time_steps, scenarios):
+    # 기존 스크립트의 pandas Series 반복문 (비교 기준)
+    import pandas as pd
+
+    flux = _inputs(time_steps, scenarios)
+    series = [[pd.Series(flux[k, s]) for k in range(4)] for s in range(scenarios)]
+
+    def run():
+        for Qin, Qout, P, D in series:
+            dC = np.zeros(time_steps)
+            dC[0] = 1e7
+            for t in range(1, time_steps):
+                dC[t] = dC[t-1] + (Qin[t-1] - Qout[t-1] + (P[t-1] - D[t-1])) * 1
+    return run
+
+
+def bench_trend(time_steps, scenarios):
+    # 블록 하나 분량의 계열만 만들어 두고 블록마다 재사용 (전체 배열을 만들지 않음)
+    blocks = list(_blocks(time_steps, 4 * scenarios))
+    flux = _inputs(time_steps, -(-blocks[0] // 4)).reshape(-1, time_steps)
+    years = np.arange(time_steps)
+    future = [time_steps, time_steps + 1]
+
+    def run():
+        for n in blocks:
+            predict_future_values(flux[:n], years, future)
+    return run
+
+
+def bench_metrics(time_steps, scenarios):
+    blocks = list(_blocks(time_steps, scenarios))
+    rng = np.random.default_rng(1)
+    observed = 1e7 + rng.normal(0, 1e4, time_steps)
+    model = observed + rng.normal(0, 5e4, (blocks[0], time_steps))
+
+    def run():
+        for n in blocks:
+            차이 = model[:n] - observed
+            np.mean(np.abs(차이), axis=-1)
+            np.sqrt(np.mean(차이 ** 2, axis=-1))
+            np.mean(np.abs(차이 / observed * 100), axis=-1)
+    return run
+
+
+def bench_metrics_accumulator(time_steps, scenarios):
+    blocks = list(_blocks(time_steps, scenarios))
+    rng = np.random.default_rng(1)
+    observed = 1e7 + rng.normal(0, 1e4, time_steps)
+    model = observed + rng.normal(0, 5e4, (blocks[0], time_steps))
+
+    def run():
+        acc = ErrorAccumulator(time_steps)
+        for n in blocks:
+            acc.update(model[:n], observed)
+        acc.result()
+    return run
+
+
+def _write_csv(path, rows):
+    rng = np.random.default_rng(2)
+    header = ",출생아수(명),사망자수(명),남자인구수 (명),여자인구수 (명),일반혼인율(남편),일반혼인율(아내),Qin,Qout\n"
+    data = np.column_stack([
+        np.arange(rows) + 2012,
+        rng.integers(40_000, 90_000, rows), rng.integers(40_000, 55_000, rows),
+        rng.integers(4_500_000, 5_000_000, rows), rng.integers(4_800_000, 5_200_000, rows),
+        rng.integers(80, 170, rows) / 10, rng.integers(80, 170, rows) / 10,
+        rng.integers(1_200_000, 1_600_000, rows), rng.integers(1_200_000, 1_700_000, rows),
+    ])
+    with open(path, 'w', encoding='euc-kr') as f:
+        f.write(header)
+        np.savetxt(f, data, delimiter=',', fmt=['%d'] * 5 + ['%.1f'] * 2 + ['%d'] * 2)
+
+
+def bench_read_csv(time_steps, scenarios, tmp_dir):
+    import pandas as pd
+
+    path = os.path.join(tmp_dir, f'data_{time_steps}.csv')
+    if not os.path.exists(path):
+        _write_csv(path, time_steps)
+    return lambda: pd.read_csv(path, encoding='euc-kr')
+
+
+def bench_load_table(time_steps, scenarios, tmp_dir):
+    from data_cache import load_table
+
+    path = os.path.join(tmp_dir, f'data_{time_steps}.csv')
+    if not os.path.exists(path):
+        _write_csv(path, time_steps)
+    load_table(path)  # 캐시 생성은 측정에서 제외
+
+    def run():
+        table = load_table(path)
+        for column in table.values():
+            column.sum()  # 실제로 값을 읽도록 함
+    return run
+
+
+CASES = {
+    'simulate': bench_simulate,
+    'simulate_int64': functools.partial(bench_simulate, mode='int64'),
+    'simulate_float32': functools.partial(bench_simulate, mode='float32'),
+    'simulate_loop': bench_simulate_loop,
+    'trend': bench_trend,
+    'metrics': bench_metrics,
+    'metrics_accumulator': bench_metrics_accumulator,
+    'read_csv': bench_read_csv,
+    'load_table': bench_load_table,
+}
+CSV_CASES = ('read_csv', 'load_table')
+
+
+def run_benchmarks(sizes, cases, repeat, tmp_dir):
+    results = []
+    for size in sizes:
+        time_steps, scenarios = SIZES[size]
+        for case in cases:
+            if case == 'simulate_loop' and time_steps * scenarios > LOOP_LIMIT:
+                continue
+            if case in CSV_CASES:
+                func = CASES[case](time_steps, scenarios, tmp_dir)
+            else:
+                func = CASES[case](time_steps, scenarios)
+            times = _timeit(func, repeat)
+            elements = time_steps * (1 if case in CSV_CASES else scenarios)
+            results.append({
+                'case': case, 'size': size, 'time_steps': time_steps, 'scenarios': scenarios,
+                'repeat': repeat, 'best_s': min(times), 'median_s': statistics.median(times),
+                'elements_per_s': elements / min(times),
+            })
+            print(f"{case:>19} {size:>7} ({time_steps}x{scenarios}): "
+                  f"best {min(times) * 1000:10.3f} ms, median {statistics.median(times) * 1000:10.3f} ms")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """기준 결과보다 threshold 배 이상 느려진 항목 리스트를 반환한다."""
+    reference = {(r['case'], r['size']): r for r in baseline['results']}
+    regressions = []
+    for r in results:
+        base = reference.get((r['case'], r['size']))
+        if base is None:
+            continue
+        ratio = r['best_s'] / base['best_s']
+        r['baseline_ratio'] = ratio
+        mark = "느려짐" if ratio > threshold else ""
+        print(f"{r['case']:>19} {r['size']:>7}: 기준 대비 {ratio:6.2f}배 {mark}")
+        if ratio > threshold:
+            regressions.append(r)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="박스 모델 성능 측정")
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=['tiny', 'small', 'medium'])
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--baseline', help="비교할 기준 결과 JSON")
+    parser.add_argument('--threshold', type=float, default=1.2, help="느려짐으로 판단할 배율")
+    parser.add_argument('--save-baseline', help="이번 결과를 기준 결과로 저장할 경로")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results = run_benchmarks(args.sizes, args.cases, args.repeat, tmp_dir)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+
+    report = {
+        'python': sys.version.split()[0], 'numpy': np.__version__,
+        'platform': platform.platform(), 'cpu_count': os.cpu_count(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'results': results,
+    }
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
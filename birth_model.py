@@ -0,0 +1,117 @@
+from typing import NamedTuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from trend import predict_future_values
+
+# ======================================
+# 혼인율 기반 출생아수 예측
+# ======================================
+# 241020_1.py / 241020_2.py 는 일반혼인율(남편/아내)을 그리기만 했다. 여기서는
+#     P_t = a + Σ_{l=lo..hi} b_l x_{t-l}
+# (x = 남편, 아내 또는 두 혼인율의 평균) 형태의 시차 회귀를 모든 후보
+# (계열, lo, hi) 에 대해 한꺼번에 적합하고, 지역마다 AICc 가 가장 작은 후보를 고른다.
+#
+# - 시차 행렬 Z[t, l] = x[t - l] 은 sliding_window_view 의 뷰(복사 없음)이고,
+#   폭 w 인 연속 시차 구간 전체도 Z 위의 sliding_window_view 로 얻는다.
+# - 정규방정식의 곱 XᵀX, Xᵀy 는 이 뷰에 einsum 을 바로 적용해 계산한다.
+# - 모든 후보는 같은 표본(t >= max_lag)으로 비교한다.
+#
+# 선택된 계수는 길이 max_lag + 1 인 전체 시차 벡터에 (구간 밖은 0) 저장하므로
+# 예측은 P_T = a + coef · (x_T, x_{T-1}, ..., x_{T-max_lag}) 로 같은 식이 된다.
+
+SERIES = ('husband', 'wife', 'mean')
+
+
+class BirthModel(NamedTuple):
+    series: np.ndarray     # (...,) 선택된 혼인율 계열 번호 (SERIES)
+    lags: np.ndarray       # (..., 2) 선택된 (lo, hi) 시차
+    intercept: np.ndarray  # (...,)
+    coef: np.ndarray       # (..., max_lag + 1) 시차 0..max_lag 계수
+    aicc: np.ndarray       # (...,)
+
+
+def lag_matrix(x, max_lag):
+    """Z[..., i, l] = x[..., max_lag + i - l] 인 (..., n - max_lag, max_lag + 1) 뷰."""
+    return sliding_window_view(x, max_lag + 1, axis=-1)[..., ::-1]
+
+
+def _marriage_series(husband, wife):
+    husband = np.asarray(husband, dtype=float)
+    wife = np.asarray(wife, dtype=float)
+    return np.stack([husband, wife, (husband + wife) / 2], axis=-2)   # (..., 3, n)
+
+
+def fit(births, husband, wife, max_lag=3):
+    """모든 시차 후보를 적합하고 지역(앞쪽 축)별 최적 모델을 고른다. 입력은 (..., years)."""
+    y_full = np.asarray(births, dtype=float)
+    x = _marriage_series(husband, wife)
+    Z = lag_matrix(x, max_lag)                          # (..., 3, m, K+1) 뷰
+    y = y_full[..., max_lag:]                           # (..., m)
+    m = y.shape[-1]
+    batch = y.shape[:-1]
+
+    y_mean = y.mean(axis=-1)
+    syy = np.einsum('...t,...t->...', y, y) - m * y_mean ** 2
+
+    best = np.full(batch, np.inf)
+    result = dict(series=np.zeros(batch, dtype=np.int64), lags=np.zeros(batch + (2,), dtype=np.int64),
+                  intercept=np.zeros(batch), coef=np.zeros(batch + (max_lag + 1,)))
+    for w in range(1, max_lag + 2):
+        k = w + 2                                       # 계수 w 개 + 절편 + 분산
+        if m - k - 1 <= 0:
+            break
+        # 폭 w 인 모든 연속 시차 구간: (..., 3, m, K+2-w, w) 뷰
+        X = sliding_window_view(Z, w, axis=-1)
+        x_mean = X.mean(axis=-3)                                                 # (..., 3, P, w)
+        A = np.einsum('...tpi,...tpj->...pij', X, X) - m * np.einsum('...pi,...pj->...pij', x_mean, x_mean)
+        c = np.einsum('...tpi,...t->...pi', X, y[..., np.newaxis, :]) \
+            - m * x_mean * y_mean[..., np.newaxis, np.newaxis, np.newaxis]
+        b = np.linalg.solve(A + 1e-9 * np.eye(w) * np.trace(A, axis1=-2, axis2=-1)[..., None, None],
+                            c[..., np.newaxis])[..., 0]                          # (..., 3, P, w)
+        rss = np.maximum(syy[..., np.newaxis, np.newaxis] - np.einsum('...i,...i->...', b, c), 1e-12)
+        aicc = m * np.log(rss / m) + 2 * k + 2 * k * (k + 1) / (m - k - 1)      # (..., 3, P)
+
+        flat = aicc.reshape(batch + (-1,))
+        pick = np.argmin(flat, axis=-1)
+        score = np.take_along_axis(flat, pick[..., np.newaxis], -1)[..., 0]
+        better = score < best
+        s, lo = np.divmod(pick, aicc.shape[-1])
+        coef_w = np.take_along_axis(b.reshape(batch + (-1, w)), pick[..., np.newaxis, np.newaxis], -2)[..., 0, :]
+        xm_w = np.take_along_axis(x_mean.reshape(batch + (-1, w)), pick[..., np.newaxis, np.newaxis], -2)[..., 0, :]
+
+        full = np.zeros(batch + (max_lag + 1,))
+        idx = lo[..., np.newaxis] + np.arange(w)
+        np.put_along_axis(full, idx, coef_w, axis=-1)
+        best = np.where(better, score, best)
+        result['series'] = np.where(better, s, result['series'])
+        result['lags'] = np.where(better[..., np.newaxis], np.stack([lo, lo + w - 1], axis=-1), result['lags'])
+        result['intercept'] = np.where(better, y_mean - np.sum(coef_w * xm_w, axis=-1), result['intercept'])
+        result['coef'] = np.where(better[..., np.newaxis], full, result['coef'])
+
+    return BirthModel(aicc=best, **result)
+
+
+def predict_births(births, husband, wife, years, future_years, max_lag=3, model=None):
+    """혼인율 시차 회귀로 future_years 의 출생아수를 예측한다. 반환값은 (..., len(future_years)).
+
+    시차보다 먼 미래의 혼인율은 선형 추세(trend.predict_future_values)로 연장한다.
+    trend.predict_future_values 대신 박스 모델의 P 예측에 그대로 쓸 수 있다.
+    """
+    if model is None:
+        model = fit(births, husband, wife, max_lag)
+    years = np.asarray(years).ravel()
+    future_years = np.asarray(future_years).ravel()
+    x = _marriage_series(husband, wife)                               # (..., 3, n)
+
+    # 필요한 미래 혼인율을 추세로 채움
+    ahead = int(max(future_years.max() - years[-1], 0))
+    if ahead:
+        extra = predict_future_values(x, years, years[-1] + np.arange(1, ahead + 1))
+        x = np.concatenate([x, extra], axis=-1)
+    chosen = np.take_along_axis(x, model.series[..., np.newaxis, np.newaxis], axis=-2)[..., 0, :]
+
+    Z = lag_matrix(chosen, max_lag)                                   # 행 i 는 시점 max_lag + i
+    rows = (len(years) - 1 + (future_years - years[-1])) - max_lag
+    return model.intercept[..., np.newaxis] + np.einsum('...fl,...l->...f', Z[..., rows, :], model.coef)
@@ -0,0 +1,166 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from box_model import net_flux, simulate
+
+# ======================================
+# 선형 추세 예측의 부트스트랩 예측 구간
+# ======================================
+# trend.predict_future_values 는 2024, 2025년의 점 예측값만 준다. 여기서는 회귀 잔차를
+# 재추출해 흐름(Qin, Qout, P, D) 경로를 수천 개 만들고, 그 경로를 박스 모델로 적분해
+# 인구수 예측 구간을 구한다.
+#
+#   y = X β + e,   X = [1, 연도 - 평균],   β̂ = H y  (H = X 의 유사역행렬, 모든 계열 공통)
+#   재표본 y* = X β̂ + e*  ->  β* = β̂ + H e*
+#   미래 경로 = X_f β* + (미래 시점의 재추출 잔차)
+#
+# 재적합은 LinearRegression.fit 반복 대신 H 를 재사용한다. e* = e[idx] 이므로
+#     H e* = Σ_s e[s] M[b, s],   M[b, s] = Σ_{t: idx[b, t] = s} H[:, t]
+# 를 미리 만들어 두면 모든 계열 x 모든 반복의 계수가 행렬 곱 한 번으로 나온다.
+#
+# 재추출 방법:
+#   residual  잔차를 시점마다 독립으로 복원 추출
+#   block     길이 block_size 의 순환 블록으로 추출 (잔차의 자기상관 보존)
+# 재추출 번호는 모든 지역/흐름에 공통으로 써서 흐름 간, 지역 간 상관을 유지한다.
+#
+# 입력 fluxes 는 (..., 4, years) 배열 (앞쪽 축은 지역 등), 흐름 순서는 (Qin, Qout, P, D).
+
+METHODS = ('residual', 'block')
+
+BLOCK_ELEMENTS = 1 << 24  # 한 번에 만드는 경로 배열의 최대 원소 수
+
+
+class BootstrapResult(NamedTuple):
+    quantiles: np.ndarray         # (n_quantiles,)
+    future_years: np.ndarray      # (horizon,)
+    flux: np.ndarray              # (..., 4, horizon) 점 예측 흐름
+    flux_bands: np.ndarray        # (..., n_quantiles, 4, horizon)
+    population: np.ndarray        # (..., horizon) 점 예측 인구수
+    population_bands: np.ndarray  # (..., n_quantiles, horizon)
+    n_boot: int
+
+
+def design_matrix(years):
+    """중심화한 연도의 설계 행렬 X (n, 2) 와 유사역행렬 H (2, n), 연도 평균."""
+    x = np.asarray(years, dtype=float).ravel()
+    x_mean = x.mean()
+    X = np.column_stack([np.ones_like(x), x - x_mean])
+    return X, np.linalg.pinv(X), x_mean
+
+
+def resample_indices(n, length, n_boot, method='residual', block_size=3, seed=None):
+    """잔차 번호 (n_boot, length). 각 행이 재추출된 잔차 시계열 하나."""
+    rng = np.random.default_rng(seed)
+    if method == 'residual':
+        return rng.integers(0, n, (n_boot, length))
+    if method == 'block':
+        n_blocks = -(-length // block_size)
+        starts = rng.integers(0, n, (n_boot, n_blocks, 1))
+        idx = (starts + np.arange(block_size)) % n
+        return idx.reshape(n_boot, -1)[:, :length]
+    raise ValueError(f"알 수 없는 재추출 방법: {method} ({', '.join(METHODS)})")
+
+
+def _refit_weights(H, idx):
+    # M[b, s, k] = Σ_{t: idx[b, t] = s} H[k, t]   ->  β*[b] - β̂ = Σ_s e[s] M[b, s]
+    n_boot, n = idx.shape
+    flat = (np.arange(n_boot)[:, np.newaxis] * n + idx).ravel()
+    M = np.empty((n_boot, n, H.shape[0]))
+    for k in range(H.shape[0]):
+        M[..., k] = np.bincount(flat, weights=np.broadcast_to(H[k], idx.shape).ravel(),
+                                minlength=n_boot * n).reshape(n_boot, n)
+    return M
+
+
+def refit_basis(years, future_years, idx):
+    """연도와 재추출 번호에만 의존하는 값 (X, H, X_f, M). 계열 블록마다 다시 만들지 않도록 한 번만 계산한다."""
+    X, H, x_mean = design_matrix(years)
+    future = np.asarray(future_years, dtype=float).ravel() - x_mean
+    Xf = np.column_stack([np.ones_like(future), future])
+    return X, H, Xf, _refit_weights(H, idx[:, :len(X)])   # M: (B, n, 2)
+
+
+def flux_paths(fluxes, years, future_years, idx, basis=None):
+    """재추출 번호 idx (B, years + horizon) 로 만든 미래 흐름 경로 (..., B, horizon).
+
+    idx 의 앞쪽 years 열은 재적합용, 나머지 horizon 열은 미래 시점의 잔차이다.
+    basis 는 refit_basis() 의 결과 (생략하면 여기서 계산).
+    """
+    y = np.asarray(fluxes, dtype=float)
+    n = y.shape[-1]
+    X, H, Xf, M = basis if basis is not None else refit_basis(years, future_years, idx)
+
+    beta = y @ H.T                                   # (..., 2)
+    e = (y - beta @ X.T) * np.sqrt(n / max(n - 2, 1))  # 자유도 보정한 잔차
+
+    # 모든 계열 x 모든 반복의 계수 변화를 한 번의 행렬 곱으로
+    rows = e.reshape(-1, n)
+    delta = (rows @ M.transpose(1, 0, 2).reshape(n, -1)).reshape(e.shape[:-1] + M.shape[::2])
+    coef = beta[..., np.newaxis, :] + delta          # (..., B, 2)
+
+    paths = coef @ Xf.T                              # (..., B, horizon)
+    paths += e[..., idx[:, n:]]
+    return paths
+
+
+def prediction_intervals(C0, fluxes, years, future_years, n_boot=10_000, method='residual',
+                         block_size=3, quantiles=(0.05, 0.5, 0.95), seed=None):
+    """future_years 의 흐름과 인구수의 부트스트랩 예측 구간.
+
+    C0 는 첫 해의 인구수 (스칼라 또는 앞쪽 축 모양), fluxes 는 (..., 4, years).
+    인구수는 cli 의 forecast 와 같이 관측 흐름 뒤에 예측 흐름을 이어 적분한 값이다.
+    """
+    fluxes = np.asarray(fluxes, dtype=float)
+    years = np.asarray(years).ravel()
+    future_years = np.asarray(future_years).ravel()
+    quantiles = np.asarray(quantiles, dtype=float)
+    batch = fluxes.shape[:-2]
+    n, h = fluxes.shape[-1], len(future_years)
+
+    # 점 예측 (재추출 없는 경로)
+    X, H, x_mean = design_matrix(years)
+    future = future_years - x_mean
+    point_flux = (fluxes @ H.T) @ np.column_stack([np.ones(h), future]).T
+    observed_end = simulate(C0, *np.moveaxis(fluxes, -2, 0))[..., -1]
+    start = observed_end + net_flux(*np.moveaxis(fluxes[..., -1], -1, 0))   # 첫 예측 연도 인구수
+    point_pop = simulate(start, *np.moveaxis(point_flux, -2, 0))
+
+    idx = resample_indices(n, n + h, n_boot, method, block_size, seed)
+    flat = fluxes.reshape((-1, 4, n))
+    start = np.broadcast_to(start, batch).reshape(-1)
+    flux_bands = np.empty((len(flat), len(quantiles), 4, h))
+    pop_bands = np.empty((len(flat), len(quantiles), h))
+    step = max(1, BLOCK_ELEMENTS // (4 * n_boot * (n + h)))
+    basis = refit_basis(years, future_years, idx)
+    for lo in range(0, len(flat), step):
+        paths = flux_paths(flat[lo:lo + step], years, future_years, idx, basis)   # (r, 4, B, h)
+        np.maximum(paths, 0.0, out=paths)   # 인구 흐름은 음수가 될 수 없음
+        pop = simulate(start[lo:lo + step, np.newaxis], *np.moveaxis(paths, 1, 0))   # (r, B, h)
+        flux_bands[lo:lo + step] = np.moveaxis(np.quantile(paths, quantiles, axis=-2), 0, 1)
+        pop_bands[lo:lo + step] = np.moveaxis(np.quantile(pop, quantiles, axis=-2), 0, 1)
+
+    return BootstrapResult(quantiles, future_years, point_flux, flux_bands.reshape(batch + flux_bands.shape[1:]),
+                           point_pop, pop_bands.reshape(batch + pop_bands.shape[1:]), n_boot)
+
+
+if __name__ == '__main__':
+    import time
+
+    from data_cache import load_table_2023
+
+    # ======================================
+    # 데이터 읽기 (2023년 데이터 포함)
+    # ======================================
+    table = load_table_2023()
+    years = table['year']
+    fluxes = np.vstack([table['Qin'], table['Qout'], table['P'], table['D']]).astype(float)
+    C0 = 10246565
+
+    for method in METHODS:
+        start = time.perf_counter()
+        result = prediction_intervals(C0, fluxes, years, [2024, 2025], method=method, seed=0)
+        print(f"[{method}] {time.perf_counter() - start:.2f}초")
+        for year, point, band in zip(result.future_years, result.population, result.population_bands.T):
+            interval = ", ".join(f"{q:.0%}: {v:,.0f}명" for q, v in zip(result.quantiles, band))
+            print(f"{year}년 예측 인구수: {point:,.0f}명 ({interval})")
@@ -0,0 +1,99 @@
+import numpy as np
+
+# ======================================
+# 1D Box model (벡터화 버전)
+# ======================================
+# 기존 스크립트의 반복문
+#     for t in range(1, time):
+#         dC[t] = dC[t-1] + (Qin[t-1] - Qout[t-1] + P[t-1] - D[t-1]) * dt
+# 를 누적합(cumsum) 한 번으로 계산한다.
+#
+# 입력은 (years,) 1차원 배열 또는 (scenarios, years) 2차원 배열 모두 가능하며,
+# 마지막 축이 시간 축이다. pandas Series 를 넘겨도 된다.
+#
+# 수치 모드 (mode):
+#   float64  기본값 (기존 스크립트의 np.zeros(time) 과 같음)
+#   int64    BoxBodelData.csv 의 인원수는 모두 정수이므로 정수로 정확히 누적 (감사용, 오차 0).
+#            정수가 아닌 입력이나 넘칠 수 있는 크기는 오류로 처리한다.
+#   float32  메모리/대역폭 절반 (대규모 앙상블용). error_bound() 로 연도별 오차 상한을 구한다.
+
+MODES = {'float64': np.float64, 'int64': np.int64, 'float32': np.float32}
+
+# 단위 반올림 오차 u (int64 는 정확)
+UNIT_ROUNDOFF = {'float64': 2.0 ** -53, 'int64': 0.0, 'float32': 2.0 ** -24}
+
+INT64_LIMIT = 2 ** 62  # 누적 크기가 이보다 크면 int64 모드에서 넘칠 수 있다고 보고 거부
+
+
+def _as_mode(values, mode):
+    if mode != 'int64':
+        return np.asarray(values, dtype=MODES[mode])
+    values = np.asarray(values)
+    if values.dtype.kind in 'iub':
+        return values.astype(np.int64, copy=False)
+    exact = values.astype(np.int64)
+    if not np.array_equal(exact, values):
+        raise ValueError("int64 모드에는 정수 인원수만 넣을 수 있습니다")
+    return exact
+
+
+def net_flux(Qin, Qout, P, D, mode='float64'):
+    """순유입량 Qin - Qout + P - D (브로드캐스팅 적용)."""
+    Qin = _as_mode(Qin, mode)
+    return Qin - _as_mode(Qout, mode) + (_as_mode(P, mode) - _as_mode(D, mode))
+
+
+def simulate(C0, Qin, Qout, P, D, dt=1, mode='float64'):
+    """박스 모델 적분 결과 dC 를 반환한다.
+
+    C0 는 스칼라 또는 (scenarios,) 배열, Qin/Qout/P/D 는 (..., years) 배열.
+    반환값의 모양은 (..., years), 자료형은 mode 이며 dC[..., 0] = C0 이다.
+    """
+    if mode not in MODES:
+        raise ValueError(f"알 수 없는 수치 모드: {mode} ({', '.join(MODES)})")
+    flux = net_flux(Qin, Qout, P, D, mode)
+    C0 = _as_mode(C0, mode)
+    if mode == 'int64':
+        if dt != int(dt):
+            raise ValueError("int64 모드의 dt 는 정수여야 합니다")
+        dt = int(dt)
+        # 누적 절댓값의 상한으로 넘침 여부를 미리 확인
+        worst = np.max(np.abs(C0), initial=0) + abs(dt) * np.max(
+            np.abs(flux[..., :-1]).sum(axis=-1, dtype=np.float64), initial=0)
+        if worst >= INT64_LIMIT:
+            raise OverflowError("int64 모드로 누적하면 넘칠 수 있습니다")
+    shape = np.broadcast_shapes(flux.shape[:-1], C0.shape) + flux.shape[-1:]
+
+    dC = np.empty(shape, dtype=MODES[mode])
+    dC[..., 0] = C0
+    # dC[t] = C0 + dt * (flux[0] + ... + flux[t-1]), 마지막 해의 flux 는 사용하지 않음
+    np.cumsum(np.broadcast_to(flux[..., :-1], shape[:-1] + (shape[-1] - 1,)), axis=-1, out=dC[..., 1:])
+    if dt != 1:
+        dC[..., 1:] *= dt
+    dC[..., 1:] += C0[..., np.newaxis]
+    return dC
+
+
+def error_bound(C0, Qin, Qout, P, D, dt=1, mode='float32'):
+    """simulate(..., mode) 결과의 연도별 절대 오차 상한 (..., years). 입력값 자체는 정확하다고 본다.
+
+    t 번째 해의 값은 네 흐름의 변환/합산, t 번의 누적, dt 곱, C0 더하기를 거치므로
+        |오차| <= γ_{t+6} (|C0| + |dt| Σ_{k<t} (|Qin| + |Qout| + |P| + |D|)_k),  γ_n = n u / (1 - n u)
+    (Higham, 순차 합산의 오차 한계). int64 모드는 0 이다.
+    """
+    u = UNIT_ROUNDOFF[mode]
+    size = sum(np.abs(np.asarray(x, dtype=float)) for x in (Qin, Qout, P, D))
+    C0 = np.abs(np.asarray(C0, dtype=float))
+    shape = np.broadcast_shapes(size.shape[:-1], C0.shape) + size.shape[-1:]
+    total = np.zeros(shape)
+    np.cumsum(np.broadcast_to(size[..., :-1], shape[:-1] + (shape[-1] - 1,)), axis=-1, out=total[..., 1:])
+    total *= abs(dt)
+    total += C0[..., np.newaxis]
+    n = np.arange(shape[-1]) + 6
+    return n * u / (1 - n * u) * total
+
+
+def observed_population(male, female, Qin, Qout, P, D):
+    """관측 인구수에서 그 해의 출생/사망/전입/전출을 되돌린 값 (스크립트의 new_dC)."""
+    total = np.asarray(male, dtype=float) + np.asarray(female, dtype=float)
+    return total - net_flux(Qin, Qout, P, D)
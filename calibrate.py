@@ -0,0 +1,106 @@
+from typing import NamedTuple
+
+import numpy as np
+
+# ======================================
+# C0 와 흐름 보정 계수 추정
+# ======================================
+# 스크립트마다 초기값이 다르다 (C0 = 10246565 또는 5041336 + 5153982 - ... 로 재구성).
+# 여기서는 C0 와 흐름별 곱셈 보정 계수 (a, b, c, d) 를
+#     dC[t] = C0 + dt * Σ_{k<t} (a Qin_k - b Qout_k + c P_k - d D_k)
+# 가 실제 인구수 new_dC 에 가장 가깝도록 추정한다. 모델이 매개변수에 대해 선형이므로
+#     θ = (C0, a, b, c, d),  dC = X θ
+# 이고 제곱오차의 기울기는 해석적으로 2 Xᵀ(Xθ - y) 이다.
+#
+# - 지역(앞쪽 축)마다 5x5 정규방정식을 모아 배치 켤레기울기법(CG)으로 동시에 푼다.
+#   5 변수 이차식이므로 최대 5 번 반복으로 수렴한다.
+# - init (전년도 결과)를 주면 그 값에서 출발하며, ridge > 0 이면 보정 계수를
+#   init 값 쪽으로 당긴다 (자료가 짧을 때 공선성 완화).
+
+
+class CalibrationResult(NamedTuple):
+    C0: np.ndarray      # (...,)
+    scales: np.ndarray  # (..., 4) Qin, Qout, P, D 보정 계수
+    rmse: np.ndarray    # (...,) 적합 후 RMSE
+    iterations: int
+
+
+def design_matrix(Qin, Qout, P, D, dt=1):
+    """X[..., t, :] = (1, dt Σ_{k<t} Qin_k, -dt Σ Qout_k, dt Σ P_k, -dt Σ D_k)."""
+    flux = np.stack(np.broadcast_arrays(
+        np.asarray(Qin, dtype=float), -np.asarray(Qout, dtype=float),
+        np.asarray(P, dtype=float), -np.asarray(D, dtype=float)), axis=-1)
+    X = np.zeros(flux.shape[:-1] + (5,))
+    X[..., 0] = 1.0
+    np.cumsum(flux[..., :-1, :] * dt, axis=-2, out=X[..., 1:, 1:])
+    return X
+
+
+def _theta(init, y, shape):
+    theta = np.empty(shape + (5,))
+    if init is None:
+        theta[..., 0] = y[..., 0]
+        theta[..., 1:] = 1.0
+    else:
+        theta[..., 0] = init.C0
+        theta[..., 1:] = init.scales
+    return theta
+
+
+def _cg(A, b, x, tol, max_iter):
+    # 야코비 전처리 배치 CG: A (..., 5, 5), b/x (..., 5)
+    M = 1.0 / np.diagonal(A, axis1=-2, axis2=-1)
+    r = b - np.einsum('...ij,...j->...i', A, x)
+    z = M * r
+    p = z.copy()
+    rz = np.einsum('...i,...i->...', r, z)
+    limit = tol * np.linalg.norm(b, axis=-1)
+    for it in range(1, max_iter + 1):
+        Ap = np.einsum('...ij,...j->...i', A, p)
+        pAp = np.einsum('...i,...i->...', p, Ap)
+        alpha = np.where(pAp > 0, rz / np.where(pAp > 0, pAp, 1.0), 0.0)
+        x = x + alpha[..., np.newaxis] * p
+        r = r - alpha[..., np.newaxis] * Ap
+        if np.all(np.linalg.norm(r, axis=-1) <= limit):
+            return x, it
+        z = M * r
+        rz_new = np.einsum('...i,...i->...', r, z)
+        beta = np.where(rz > 0, rz_new / np.where(rz > 0, rz, 1.0), 0.0)
+        p = z + beta[..., np.newaxis] * p
+        rz = rz_new
+    return x, max_iter
+
+
+def calibrate(Qin, Qout, P, D, observed, dt=1, ridge=0.0, init=None, tol=1e-12, max_iter=50):
+    """C0 와 보정 계수를 추정한다. 입력은 (..., years) 이며 앞쪽 축(지역)별로 따로 적합한다.
+
+    ridge 는 보정 계수를 init (없으면 1) 로 당기는 상대 가중치,
+    init 은 이전 CalibrationResult (warm start).
+    """
+    y = np.asarray(observed, dtype=float)
+    X = design_matrix(Qin, Qout, P, D, dt)
+    y = np.broadcast_to(y, X.shape[:-1])
+    shape = X.shape[:-2]
+
+    # 정규방정식 (XᵀX + Λ) θ = Xᵀy + Λ θ_prior
+    A = np.einsum('...ti,...tj->...ij', X, X)
+    b = np.einsum('...ti,...t->...i', X, y)
+    theta = _theta(init, y, shape)
+    if ridge:
+        diag = np.diagonal(A, axis1=-2, axis2=-1)
+        lam = ridge * diag[..., 1:].mean(axis=-1, keepdims=True)
+        idx = np.arange(1, 5)
+        A[..., idx, idx] += lam
+        b[..., 1:] += lam * theta[..., 1:]
+
+    theta, iterations = _cg(A, b, theta, tol, max_iter)
+    resid = np.einsum('...ti,...i->...t', X, theta) - y
+    rmse = np.sqrt(np.mean(resid ** 2, axis=-1))
+    return CalibrationResult(theta[..., 0], theta[..., 1:], rmse, iterations)
+
+
+def apply(result, Qin, Qout, P, D):
+    """보정 계수를 곱한 Qin, Qout, P, D 를 반환한다 (simulate() 에 바로 넘길 수 있음)."""
+    s = np.moveaxis(result.scales, -1, 0)
+    return (np.asarray(Qin) * s[0][..., np.newaxis], np.asarray(Qout) * s[1][..., np.newaxis],
+            np.asarray(P) * s[2][..., np.newaxis], np.asarray(D) * s[3][..., np.newaxis])
@@ -0,0 +1,214 @@
+import argparse
+import importlib
+import sys
+import time
+
+import profiling
+
+# ======================================
+# 명령행 진입점
+# ======================================
+# 사용법:
+#     python cli.py simulate [--c0 N] [--numeric float64|int64|float32]
+#     python cli.py forecast [--method mean|trend|holt|damped|ar] [--horizon 2]
+#     python cli.py evaluate [--start 2018] [--end 2022]
+#     python cli.py plot [-o population.png]
+#
+# --cache 를 주면 simulate/예측/평가 결과를 입력 내용의 해시로 memo 캐시에 저장해 다시 쓴다.
+# 무거운 모듈(numpy, matplotlib 등)은 해당 하위 명령이 필요할 때만 import 하며,
+# --import-time 을 주면 모듈별 import 시간을 stderr 로 출력한다.
+# --profile/--trace 를 주면 단계(load, forecast, simulate, metrics, render)별 벽시계/CPU 시간과
+# 최대 메모리를 JSON / Chrome trace 형식으로 저장한다.
+
+_T0 = time.perf_counter()
+_import_times = {}
+
+# 예측 방식 -> (모듈, 함수). mean 은 --window 를 쓰므로 cmd_forecast 에서 직접 계산
+FORECASTERS = {
+    'trend': ('trend', 'predict_future_values'),
+    'holt': ('forecasters', 'holt'),
+    'damped': ('forecasters', 'damped_holt'),
+    'ar': ('forecasters', 'autoregressive'),
+}
+
+
+def _timed_import(name):
+    if name in sys.modules:
+        return sys.modules[name]
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    _import_times[name] = time.perf_counter() - start
+    return module
+
+
+def _load(args):
+    data_cache = _timed_import('data_cache')
+    np = _timed_import('numpy')
+    with profiling.stage('load'):
+        table = data_cache.load_table(args.data)
+        years = np.asarray(table['year'], dtype=int)
+        fluxes = np.vstack([table['Qin'], table['Qout'], table['P'], table['D']]).astype(float)
+    return years, fluxes, table
+
+
+def _stage(args, module, name, label):
+    # --cache 이면 해당 단계 함수를 memo 캐시로 감싸고, 프로파일링 중이면 단계 label 로 기록
+    func = getattr(_timed_import(module), name)
+    if args.cache:
+        if args.memo is None:
+            memo = _timed_import('memo')
+            args.memo = memo.MemoCache(memo.default_directory(args.data))
+        func = args.memo.memoize(func)
+    return profiling.traced(label)(func) if profiling.enabled() else func
+
+
+def _observed(table):
+    box_model = _timed_import('box_model')
+    return box_model.observed_population(table['male'], table['female'], table['Qin'],
+                                         table['Qout'], table['P'], table['D'])
+
+
+def _initial(args, table):
+    # 초기 인구수: 지정하지 않으면 첫 해의 실제 인구수에서 재구성 (C0 = 남 + 여 - P + D - Qin + Qout)
+    return args.c0 if args.c0 is not None else float(_observed(table)[0])
+
+
+def cmd_simulate(args):
+    simulate = _stage(args, 'box_model', 'simulate', 'simulate')
+    years, fluxes, table = _load(args)
+    C0 = _initial(args, table)
+    dC = simulate(C0, *fluxes, mode=args.numeric)
+    if args.numeric == 'float32':
+        bound = _timed_import('box_model').error_bound(C0, *fluxes, mode=args.numeric)
+        for year, value, err in zip(years, dC, bound):
+            print(f"{year}년 모델 인구수: {value:.0f}명 (반올림 오차 ±{err:.1f}명 이내)")
+        return
+    for year, value in zip(years, dC):
+        print(f"{year}년 모델 인구수: {value:.0f}명")
+
+
+def cmd_forecast(args):
+    np = _timed_import('numpy')
+    simulate = _stage(args, 'box_model', 'simulate', 'simulate')
+    years, fluxes, table = _load(args)
+    future_years = np.arange(years[-1] + 1, years[-1] + 1 + args.horizon)
+
+    if args.method == 'mean':
+        # 최근 window 년 평균 (20241027_3.py 방식)
+        with profiling.stage('forecast'):
+            future = np.repeat(fluxes[:, -args.window:].mean(axis=1, keepdims=True), args.horizon, axis=1)
+    else:
+        future = _stage(args, *FORECASTERS[args.method], 'forecast')(fluxes, years, future_years)
+
+    if args.births == 'marriage':
+        # 출생아수(P)만 혼인율 시차 회귀로 예측
+        predict_births = _stage(args, 'birth_model', 'predict_births', 'forecast_births')
+        future[2] = predict_births(fluxes[2], table['marriage_husband'], table['marriage_wife'],
+                                   years, future_years, max_lag=args.max_lag)
+
+    dC = simulate(_initial(args, table), *np.hstack([fluxes, future]))
+    for year, value in zip(future_years, dC[-args.horizon:]):
+        print(f"{year}년 예측 인구수: {value:.0f}명")
+
+
+def cmd_evaluate(args):
+    simulate = _stage(args, 'box_model', 'simulate', 'simulate')
+    years, fluxes, table = _load(args)
+
+    start = args.start if args.start is not None else years[0]
+    end = args.end if args.end is not None else years[-1]
+    sel = (years >= start) & (years <= end)
+    if not sel.any():
+        args.parser.error(f"--start {start} --end {end} 사이에 자료가 있는 연도가 없습니다 "
+                          f"({years[0]}~{years[-1]}년)")
+    new_dC = _observed(table)[sel]
+    C0 = args.c0 if args.c0 is not None else new_dC[0]
+    dC = simulate(C0, *fluxes[:, sel])
+    result = _stage(args, 'metrics', 'error_metrics', 'metrics')(dC, new_dC)
+    print("연도별 오차율:")
+    for year, error_rate in zip(years[sel], result['year_error_rate']):
+        print(f"{year}년 오차율: {error_rate:.2f}%")
+    print(f"\n평균 절대 오차 (MAE): {result['MAE']:.2f}명")
+    print(f"평균 제곱근 오차 (RMSE): {result['RMSE']:.2f}명")
+    print(f"평균 절대 백분율 오차 (MAPE): {result['MAPE']:.2f}%")
+    print(f"평균 오차 (bias): {result['bias']:.2f}명")
+    print(f"최대 절대 오차: {result['max_error']:.0f}명")
+    print(f"\n{years[sel][-1]}년 오차: {result['last_error']:.0f}명")
+    print(f"{years[sel][-1]}년 오차율: {result['last_error_rate']:.2f}%")
+
+
+def cmd_plot(args):
+    simulate = _stage(args, 'box_model', 'simulate', 'simulate')
+    _timed_import('matplotlib')  # render 는 matplotlib 을 함수 안에서 import 함
+    render = _timed_import('render')
+    years, fluxes, table = _load(args)
+    dC = simulate(_initial(args, table), *fluxes)
+    render.render_all([(render.population_figure, dict(years=years, dC=dC, new_dC=_observed(table)),
+                        args.output)], workers=1)
+    print(args.output)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="1D 박스 모델 인구 예측")
+    parser.add_argument('--data', default="BoxBodelData.csv", help="입력 CSV (EUC-KR)")
+    parser.add_argument('--c0', type=float, default=None, help="초기 인구수 (기본: 첫 해 실제 인구수에서 재구성)")
+    parser.add_argument('--import-time', action='store_true', help="모듈 import 시간을 stderr 로 출력")
+    parser.add_argument('--cache', action='store_true', help="결과를 .cache/memo 에 저장해 다시 사용")
+    parser.add_argument('--profile', metavar='JSON', default=None, help="단계별 시간/메모리를 JSON 으로 저장")
+    parser.add_argument('--trace', metavar='JSON', default=None, help="Chrome trace-event 형식으로 저장")
+    parser.add_argument('--profile-memory', choices=('rss', 'tracemalloc', 'none'), default='rss',
+                        help="메모리 측정 방식 (tracemalloc 은 정확하지만 느림)")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('simulate', help="관측된 흐름으로 모델 인구수 계산")
+    p.add_argument('--numeric', choices=('float64', 'int64', 'float32'), default='float64',
+                   help="적분 수치 모드 (int64: 정수 인원수로 정확히, float32: 메모리 절반 + 오차 상한 출력)")
+    p.set_defaults(func=cmd_simulate)
+
+    p = sub.add_parser('forecast', help="미래 인구수 예측")
+    p.add_argument('--method', choices=('mean',) + tuple(FORECASTERS), default='trend',
+                   help="흐름 예측 방식 (holt/damped: 지수평활, ar: 자기회귀)")
+    p.add_argument('--horizon', type=int, default=2, help="예측 연도 수")
+    p.add_argument('--window', type=int, default=3, help="mean 방식의 평균 연도 수")
+    p.add_argument('--births', choices=('method', 'marriage'), default='method',
+                   help="출생아수 예측: --method 와 같은 방식 또는 혼인율 시차 회귀")
+    p.add_argument('--max-lag', type=int, default=2, help="혼인율 회귀의 최대 시차")
+    p.set_defaults(func=cmd_forecast)
+
+    p = sub.add_parser('evaluate', help="MAE/RMSE/MAPE 평가")
+    p.add_argument('--start', type=int, default=None, help="평가 시작 연도")
+    p.add_argument('--end', type=int, default=None, help="평가 끝 연도")
+    p.set_defaults(func=cmd_evaluate)
+
+    p = sub.add_parser('plot', help="모델/실제 인구수 그림 저장")
+    p.add_argument('-o', '--output', default="population.png")
+    p.set_defaults(func=cmd_plot)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    args.parser = parser
+    args.memo = None
+    if args.profile or args.trace:
+        profiling.enable(None if args.profile_memory == 'none' else args.profile_memory)
+    _timed_import('numpy')  # 모든 하위 명령에 필요
+    with profiling.stage(f'cli.{args.command}'):
+        args.func(args)
+    if profiling.enabled():
+        if args.profile:
+            profiling.export_json(args.profile)
+        if args.trace:
+            profiling.export_chrome(args.trace)
+        profiling.print_summary()
+    if args.import_time:
+        for name, seconds in _import_times.items():
+            print(f"import {name}: {seconds * 1000:.1f} ms", file=sys.stderr)
+        if args.memo is not None:
+            print(f"캐시 적중: {args.memo.hits}", file=sys.stderr)
+        print(f"전체 실행 시간: {(time.perf_counter() - _T0) * 1000:.1f} ms", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
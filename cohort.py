@@ -0,0 +1,120 @@
+import numpy as np
+from scipy import sparse
+
+# ======================================
+# 연령/성별 코호트 요인 모델
+# ======================================
+# 박스 모델은 인구 전체를 숫자 하나로 다루지만, BoxBodelData.csv 에는 남자/여자 인구수가
+# 따로 있다. 여기서는 인구를 (성별 2) x (0~100세, 100세 이상은 한 칸) 배열로 두고
+#   - 생존: 나이 a -> a+1 로 생존율을 곱해 이동 (100세 칸은 남은 사람이 머무름)
+#   - 출생: 여성 연령별 출산율 x 여성 인구 -> 0세 남/여 (출생 성비로 나눔)
+#   - 이동: 순이동 인원수를 연령/성별 분포(profile)로 나누어 더함
+# 을 Leslie 형 희소행렬 L (202 x 202) 과의 곱 한 번으로 진행한다.
+#
+# 배열 배치: 인구는 (..., 2, 101) 이며 앞쪽 축은 (지역[, 시나리오]) 이다.
+# 내부에서는 (상태 202, 열) 행렬로 바꿔 L @ X 한 번으로 모든 지역/시나리오를 계산한다.
+# 지역마다 비율이 다르면 지역별 L 을 대각 블록으로 묶은 행렬을 쓴다.
+
+AGES = 101
+MALE, FEMALE = 0, 1
+STATE = 2 * AGES
+
+MALE_BIRTH_SHARE = 105 / 205  # 출생 성비 105 (여아 100명당 남아)
+
+
+def leslie_matrix(survival, fertility, male_birth_share=MALE_BIRTH_SHARE, birth_survival=1.0):
+    """Leslie 행렬 (202 x 202, CSR). 상태 번호는 성별 * 101 + 나이.
+
+    survival (2, 101): 나이 a 에서 한 해 동안 생존할 확률 (마지막은 100세 이상 칸)
+    fertility (101,): 여성 1명당 나이별 연간 출생아수
+    """
+    survival = np.asarray(survival, dtype=float)
+    fertility = np.asarray(fertility, dtype=float)
+    rows, cols, vals = [], [], []
+    for sex in (MALE, FEMALE):
+        base = sex * AGES
+        ages = np.arange(AGES)
+        # a -> a+1 (100세 칸은 자기 자신으로)
+        rows.append(base + np.minimum(ages + 1, AGES - 1))
+        cols.append(base + ages)
+        vals.append(survival[sex])
+
+    # 출생: 여성 나이 a -> 남/여 0세
+    mothers = FEMALE * AGES + np.arange(AGES)
+    for sex, share in ((MALE, male_birth_share), (FEMALE, 1 - male_birth_share)):
+        rows.append(np.full(AGES, sex * AGES))
+        cols.append(mothers)
+        vals.append(fertility * share * birth_survival)
+
+    L = sparse.coo_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+                          shape=(STATE, STATE))
+    return L.tocsr()  # 생존은 1세 이상 행, 출생은 0세 행에만 들어가므로 같은 칸이 겹치지 않음
+
+
+def regional_leslie(survival, fertility, male_birth_share=MALE_BIRTH_SHARE, birth_survival=1.0):
+    """지역별 비율 survival (R, 2, 101), fertility (R, 101) 로 만든 대각 블록 행렬 (202R x 202R)."""
+    blocks = [leslie_matrix(s, f, male_birth_share, birth_survival) for s, f in zip(survival, fertility)]
+    return sparse.block_diag(blocks, format='csr')
+
+
+def _to_state(pop, regional):
+    # (R[, S], 2, 101) -> 공통 L: (202, R*S) / 지역별 L: (R*202, S)
+    if regional:
+        R = pop.shape[0]
+        X = pop.reshape(R, -1, STATE)                 # (R, S, 202)
+        return np.ascontiguousarray(X.transpose(0, 2, 1)).reshape(R * STATE, -1)
+    return np.ascontiguousarray(pop.reshape(-1, STATE).T)
+
+
+def _from_state(X, shape, regional):
+    if regional:
+        R = shape[0]
+        return X.reshape(R, STATE, -1).transpose(0, 2, 1).reshape(shape)
+    return X.T.reshape(shape)
+
+
+def project(pop, L, years, net_migration=None, profile=None):
+    """코호트 인구를 years 년 진행한다. 반환값은 (years + 1, ..., 2, 101).
+
+    pop: (R, 2, 101) 또는 (R, S, 2, 101) 초기 인구
+    L: leslie_matrix() (모든 지역 공통) 또는 regional_leslie() (지역별)
+    net_migration: (years, R) 또는 (years, R, S) 연간 순이동 인원수
+    profile: (2, 101) 또는 (R, 2, 101) 이동 인구의 성별/연령 분포 (합이 1)
+    """
+    pop = np.asarray(pop, dtype=float)
+    shape = pop.shape
+    regional = L.shape[0] != STATE
+    X = _to_state(pop, regional)
+
+    if net_migration is not None:
+        # 순이동 (years, R[, S]) -> (years, R, [S|1,] 1, 1), 분포 (R, 2, 101) -> (R, [1,] 2, 101)
+        migration = np.asarray(net_migration, dtype=float)
+        migration = migration.reshape(migration.shape + (1,) * (len(shape) - 1 - migration.ndim) + (1, 1))
+        profile = np.asarray(profile, dtype=float)
+        if profile.ndim == 3 and len(shape) == 4:
+            profile = profile[:, np.newaxis]
+
+    out = np.empty((years + 1,) + shape)
+    out[0] = pop
+    for t in range(years):
+        X = L @ X
+        if net_migration is not None:
+            X += _to_state(np.broadcast_to(migration[t] * profile, shape), regional)
+        out[t + 1] = _from_state(X, shape, regional)
+    return out
+
+
+def vital_events(pop, survival, fertility):
+    """코호트 인구로부터 박스 모델의 P (출생아수) 와 D (사망자수) 합계를 구한다."""
+    pop = np.asarray(pop, dtype=float)
+    births = np.sum(pop[..., FEMALE, :] * fertility, axis=-1)
+    deaths = np.sum(pop * (1 - np.asarray(survival)), axis=(-2, -1))
+    return births, deaths
+
+
+def from_totals(male, female, age_profile):
+    """남자/여자 인구수 합계를 나이 분포 age_profile (2, 101) 로 나누어 코호트 인구를 만든다."""
+    age_profile = np.asarray(age_profile, dtype=float)
+    age_profile = age_profile / age_profile.sum(axis=-1, keepdims=True)
+    totals = np.stack([np.asarray(male, dtype=float), np.asarray(female, dtype=float)], axis=-1)
+    return totals[..., np.newaxis] * age_profile
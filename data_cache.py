@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+import profiling
+
+# ======================================
+# 입력 CSV 의 이진 컬럼 캐시
+# ======================================
+# pd.read_csv(file, encoding='euc-kr') 를 매번 다시 하는 대신, 처음 한 번만 CSV 를 읽어
+# 컬럼마다 .npy 파일로 저장하고 이후에는 np.load(mmap_mode='r') 로 바로 매핑한다.
+#
+# 캐시 위치: <CSV 폴더>/.cache/<CSV 파일명>/
+#     meta.json      원본 크기, mtime, sha256, 컬럼 이름 대응표
+#     <컬럼>.npy     정규화된 이름의 컬럼 배열
+#
+# 원본의 크기/mtime 이 바뀌면 sha256 을 다시 계산하고, 내용도 바뀌었으면 캐시를 다시 만든다.
+
+CACHE_VERSION = 1
+
+# 한글 헤더 -> 정규화된 컬럼 이름
+CANONICAL_COLUMNS = {
+    'Unnamed: 0': 'year',
+    '연도': 'year',
+    'Qin': 'Qin',
+    'Qout': 'Qout',
+    '출생아수(명)': 'P',
+    '사망자수(명)': 'D',
+    '남자인구수 (명)': 'male',
+    '여자인구수 (명)': 'female',
+    '일반혼인율(남편)': 'marriage_husband',
+    '일반혼인율(아내)': 'marriage_wife',
+}
+
+
+# CSV 에 아직 없는 2023년 자료 (여러 스크립트의 데모가 끝에 덧붙여 쓰는 값)
+ROW_2023 = {'year': 2023, 'Qin': 1206963, 'Qout': 1238213, 'P': 39456, 'D': 51446,
+            'male': 4540031, 'female': 4846003}
+
+
+def canonical_name(column):
+    return CANONICAL_COLUMNS.get(column, column.strip())
+
+
+def _file_hash(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _read_meta(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, 'meta.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(cache_dir, meta):
+    tmp = os.path.join(cache_dir, 'meta.json.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, os.path.join(cache_dir, 'meta.json'))
+
+
+def _build(path, encoding, cache_dir, stat, digest):
+    import pandas as pd  # 캐시를 새로 만들 때만 필요
+
+    with profiling.stage('read_csv', path=os.path.basename(path)):
+        df = pd.read_csv(path, encoding=encoding)
+    parent = os.path.dirname(cache_dir)
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix='.build-')
+
+    columns = {}
+    for column in df.columns:
+        name = canonical_name(column)
+        values = df[column].to_numpy()
+        if values.dtype == object:
+            values = values.astype(str)  # 문자열은 고정 길이 유니코드로 저장
+        np.save(os.path.join(tmp_dir, name + '.npy'), values)
+        columns[name] = column
+
+    meta = {'version': CACHE_VERSION, 'size': stat.st_size, 'mtime': stat.st_mtime,
+            'sha256': digest, 'encoding': encoding, 'columns': columns}
+    _write_meta(tmp_dir, meta)
+
+    # 완성된 캐시로 교체 (중간에 실패해도 기존 캐시가 깨지지 않음)
+    if os.path.isdir(cache_dir):
+        shutil.rmtree(cache_dir)
+    os.replace(tmp_dir, cache_dir)
+    return meta
+
+
+def cache_path(path):
+    path = os.path.abspath(path)
+    return os.path.join(os.path.dirname(path), '.cache', os.path.basename(path))
+
+
+def load_table(path, encoding='euc-kr', cache_dir=None):
+    """CSV 를 {정규화된 컬럼 이름: 메모리 매핑된 배열} 로 읽는다.
+
+    캐시가 최신이면 CSV 를 전혀 파싱하지 않는다.
+    """
+    cache_dir = cache_dir or cache_path(path)
+    stat = os.stat(path)
+    meta = _read_meta(cache_dir)
+
+    fresh = (meta is not None and meta.get('version') == CACHE_VERSION
+             and meta.get('encoding') == encoding)
+    if fresh and (meta['size'], meta['mtime']) != (stat.st_size, stat.st_mtime):
+        # 크기나 수정 시각이 바뀐 경우에만 내용 해시를 비교
+        digest = _file_hash(path)
+        fresh = digest == meta['sha256']
+        if fresh:
+            meta.update(size=stat.st_size, mtime=stat.st_mtime)
+            _write_meta(cache_dir, meta)
+    if not fresh:
+        meta = _build(path, encoding, cache_dir, stat, _file_hash(path))
+
+    return {name: np.load(os.path.join(cache_dir, name + '.npy'), mmap_mode='r')
+            for name in meta['columns']}
+
+
+def append_row(table, row=ROW_2023):
+    """table 의 각 컬럼 끝에 row 의 값을 덧붙인 새 dict (row 에 없는 컬럼은 NaN).
+
+    마지막 연도가 이미 row['year'] 이상이면 그대로 복사해 돌려준다.
+    """
+    if 'year' in table and len(table['year']) and table['year'][-1] >= row['year']:
+        return {name: np.asarray(values) for name, values in table.items()}
+    return {name: np.append(values, row.get(name, np.nan)) for name, values in table.items()}
+
+
+def load_table_2023(path="BoxBodelData.csv", encoding='euc-kr'):
+    """load_table(path) 에 2023년 자료를 덧붙인 컬럼 사전."""
+    return append_row(load_table(path, encoding))
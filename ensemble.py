@@ -0,0 +1,160 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+
+import profiling
+from box_model import error_bound, simulate
+
+# ======================================
+# Monte Carlo 앙상블 예측
+# ======================================
+# 미래 Qin/Qout/P/D 를 평균 경로 + 정규 잡음으로 수백만 개 뽑아 박스 모델로 적분하고
+# 연도별 분위수 구간을 돌려준다.
+#
+# - 표본은 chunk_size 개씩 나누어 처리하므로 최대 메모리는 앙상블 크기와 무관하다.
+# - 각 청크는 연도별 고정 구간 히스토그램만 반환하고, 히스토그램을 합친 뒤 분위수를 구한다.
+# - 청크들은 ProcessPoolExecutor 로 모든 코어에 나누어 계산한다.
+# - mode='float32' 이면 표본과 적분을 float32 로 하여 메모리/대역폭을 절반으로 줄인다.
+#   표본의 흐름 크기 최댓값으로 box_model.error_bound 를 구해 연도별 반올림 오차 상한을 함께 돌려준다.
+#
+# flux 배열의 첫 번째 축은 (Qin, Qout, P, D) 순서, 마지막 축은 예측 연도이다.
+
+FLUX_NAMES = ('Qin', 'Qout', 'P', 'D')
+
+N_BINS = 4096   # 연도별 히스토그램 구간 수
+N_SIGMA = 8.0   # 히스토그램 범위: 평균 ± 8 표준편차
+
+
+class EnsembleResult(NamedTuple):
+    quantiles: np.ndarray  # (n_quantiles,)
+    bands: np.ndarray      # (n_quantiles, horizon) 분위수별 인구수
+    mean: np.ndarray       # (horizon,) 앙상블 평균 인구수
+    n_samples: int
+    error_bound: np.ndarray = None  # (horizon,) 모든 표본에 대한 반올림 오차 상한 (명)
+
+
+def mean_forecast(history, horizon, window=3):
+    """최근 window 년 평균(20241027_3.py 방식)과 그 표준편차를 (4, horizon) 경로로 만든다.
+
+    history 는 (4, years) 배열 (Qin, Qout, P, D).
+    """
+    recent = np.asarray(history, dtype=float)[:, -window:]
+    mean = np.repeat(recent.mean(axis=1, keepdims=True), horizon, axis=1)
+    sigma = np.repeat(recent.std(axis=1, ddof=1, keepdims=True), horizon, axis=1)
+    return mean, sigma
+
+
+def _hist_edges(C0, mean, sigma):
+    # 선형 모델이므로 연도별 인구수의 평균과 분산을 해석적으로 구해 히스토그램 범위를 정한다
+    net = mean[0] - mean[1] + mean[2] - mean[3]
+    var = (sigma ** 2).sum(axis=0)
+    centre = simulate(C0, net, 0, 0, 0)
+    spread = np.sqrt(np.concatenate([[0.0], np.cumsum(var[:-1])]))
+    half = N_SIGMA * spread + 1.0
+    return centre - half, centre + half
+
+
+def _run_chunk(args):
+    C0, mean, sigma, n, seed, lo, hi, mode = args
+    rng = np.random.default_rng(seed)
+    dtype = np.float32 if mode == 'float32' else np.float64
+    flux = rng.standard_normal((n,) + mean.shape, dtype=dtype)
+    flux *= sigma.astype(dtype)
+    flux += mean.astype(dtype)
+    np.maximum(flux, 0, out=flux)  # 인구 흐름은 음수가 될 수 없음
+
+    dC = simulate(C0, flux[:, 0], flux[:, 1], flux[:, 2], flux[:, 3], mode=mode)
+    # 흐름이 0 이상이므로 표본별 최댓값으로 구한 상한이 청크 안 모든 표본의 상한이 된다
+    bound = error_bound(C0, *flux.max(axis=0), mode=mode)
+
+    # 연도별 히스토그램 (범위 밖 값은 양 끝 구간에 포함)
+    horizon = dC.shape[1]
+    idx = np.floor((dC - lo) / (hi - lo) * N_BINS).astype(np.int64)
+    np.clip(idx, 0, N_BINS - 1, out=idx)
+    idx += np.arange(horizon) * N_BINS
+    counts = np.bincount(idx.ravel(), minlength=horizon * N_BINS).reshape(horizon, N_BINS)
+    return counts, dC.sum(axis=0, dtype=np.float64), bound
+
+
+def _hist_quantiles(counts, lo, hi, quantiles):
+    cdf = np.cumsum(counts, axis=1)
+    total = cdf[:, -1:]
+    width = (hi - lo) / N_BINS
+    bands = np.empty((len(quantiles), counts.shape[0]))
+    for i, q in enumerate(quantiles):
+        target = q * total
+        b = np.argmax(cdf >= target, axis=1)
+        rows = np.arange(counts.shape[0])
+        below = np.where(b > 0, cdf[rows, b - 1], 0)
+        inside = counts[rows, b]
+        frac = np.where(inside > 0, (target[:, 0] - below) / np.maximum(inside, 1), 0.5)
+        bands[i] = lo + (b + frac) * width
+    return bands
+
+
+def run_ensemble(C0, mean, sigma, n_samples, quantiles=(0.05, 0.5, 0.95),
+                 chunk_size=100_000, seed=None, workers=None, mode='float64'):
+    """앙상블 예측을 실행한다.
+
+    C0 는 첫 예측 연도의 인구수, mean/sigma 는 (4, horizon) 평균 경로와 표준편차
+    (sigma 는 (4,) 도 가능). simulate() 와 같이 마지막 해의 흐름은 사용되지 않는다.
+    mode 는 'float64' 또는 'float32' (표본이 연속값이므로 int64 는 쓸 수 없음).
+    """
+    if mode not in ('float64', 'float32'):
+        raise ValueError(f"앙상블은 float64/float32 모드만 지원합니다: {mode}")
+    mean = np.asarray(mean, dtype=float)
+    if mean.ndim != 2 or len(mean) != len(FLUX_NAMES):
+        raise ValueError(f"mean 은 ({', '.join(FLUX_NAMES)}) x 연도 배열이어야 합니다: {mean.shape}")
+    sigma = np.broadcast_to(np.asarray(sigma, dtype=float).reshape(len(mean), -1), mean.shape)
+    quantiles = np.asarray(quantiles, dtype=float)
+    lo, hi = _hist_edges(float(C0), mean, sigma)
+
+    sizes = [chunk_size] * (n_samples // chunk_size)
+    if n_samples % chunk_size:
+        sizes.append(n_samples % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(float(C0), mean, sigma, n, s, lo, hi, mode) for n, s in zip(sizes, seeds)]
+
+    workers = workers or os.cpu_count() or 1
+    counts = np.zeros((mean.shape[1], N_BINS), dtype=np.int64)
+    total = np.zeros(mean.shape[1])
+    bound = np.zeros(mean.shape[1])
+    run = profiling.task(_run_chunk)
+    if workers == 1 or len(tasks) == 1:
+        for c, s, b in profiling.gather(map(run, tasks)):
+            counts += c
+            total += s
+            np.maximum(bound, b, out=bound)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for c, s, b in profiling.gather(pool.map(run, tasks)):
+                counts += c
+                total += s
+                np.maximum(bound, b, out=bound)
+
+    bands = _hist_quantiles(counts, lo, hi, quantiles)
+    return EnsembleResult(quantiles, bands, total / n_samples, n_samples, bound)
+
+
+if __name__ == '__main__':
+    from data_cache import load_table_2023
+
+    # ======================================
+    # 데이터 읽기 (2023년 데이터 포함)
+    # ======================================
+    table = load_table_2023()
+    history = np.vstack([table['Qin'], table['Qout'], table['P'], table['D']]).astype(float)
+
+    C0 = 10246565
+    dC = simulate(C0, *history)
+    C_2024 = dC[-1] + (history[0, -1] - history[1, -1] + history[2, -1] - history[3, -1])
+
+    # 2024, 2025년: 최근 3년 평균 ± 표준편차
+    mean, sigma = mean_forecast(history, horizon=2)
+    result = run_ensemble(C_2024, mean, sigma, n_samples=1_000_000, seed=0)
+
+    for year, column in zip((2024, 2025), result.bands.T):
+        band = ", ".join(f"{q:.0%}: {v:,.0f}명" for q, v in zip(result.quantiles, column))
+        print(f"{year}년 예측 인구수 분위수 - {band}")
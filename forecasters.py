@@ -0,0 +1,196 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from trend import predict_future_values
+
+# ======================================
+# 흐름 예측기 (일괄 처리)
+# ======================================
+# 20241027_2/3 은 Qin[-3:].mean() 같은 최근 평균을, 20241027_4/5 는 선형 추세를 썼다.
+# 그 중간으로 Holt 선형/감쇠 추세 지수평활과 저차 AR 모델을 추가한다. 모든 예측기는
+# trend.predict_future_values 와 같은 형태
+#     forecaster(y_values, years, future_years) -> (..., len(future_years))
+# 이므로 박스 모델에 미래 흐름을 넣는 곳 어디서나 바꿔 쓸 수 있다 (FORECASTERS).
+#
+# - Holt: 모수 격자 (alpha, beta[, phi]) 전체를 (계열, 격자) 배열로 한꺼번에 평활하고
+#   한 단계 앞 예측 오차 제곱합이 가장 작은 모수를 계열마다 고른다.
+# - AR(p): 절편 포함 최소제곱 해를 정규방정식으로 모든 계열에 대해 한 번에 풀고
+#   차수는 같은 표본에서 AICc 로 고른다.
+#
+# y_values 는 (years,) 또는 (..., years) 배열 (예: (지역 수, 4, years)).
+
+ALPHAS = np.linspace(0.1, 0.9, 9)
+BETAS = np.linspace(0.1, 0.9, 9)
+PHIS = np.array([0.8, 0.85, 0.9, 0.95, 0.98])
+
+BLOCK_ELEMENTS = 1 << 18  # Holt 격자 평활에서 한 번에 다루는 (계열 x 격자) 원소 수
+
+# 예측기별로 필요한 최소 연도 수 (mean 은 window)
+MIN_YEARS = {'trend': 2, 'holt': 3, 'damped': 3, 'ar': 6}
+
+
+def _steps(years, future_years):
+    # 마지막 관측 연도로부터 몇 단계 앞인지 (1 이상)
+    steps = np.asarray(future_years).ravel() - np.asarray(years).ravel()[-1]
+    if np.any(steps < 1):
+        raise ValueError("future_years 는 마지막 관측 연도 이후여야 합니다")
+    return steps.astype(np.int64)
+
+
+def recent_mean(y_values, years, future_years, window=3):
+    """최근 window 년 평균 (20241027_3.py 방식)."""
+    y = np.asarray(y_values, dtype=float)
+    h = len(np.asarray(future_years).ravel())
+    return np.repeat(y[..., -window:].mean(axis=-1, keepdims=True), h, axis=-1)
+
+
+# ======================================
+# Holt 지수평활
+# ======================================
+def _holt_grid(y, alpha, beta, phi):
+    # y: (S, n), 모수: (G,) -> 한 단계 앞 오차 제곱합, 마지막 수준/추세 (S, G)
+    level = np.repeat(y[:, :1], len(alpha), axis=1)
+    slope = np.repeat(y[:, 1:2] - y[:, :1], len(alpha), axis=1)
+    sse = np.zeros_like(level)
+    for t in range(1, y.shape[1]):
+        pred = level + phi * slope
+        err = y[:, t:t + 1] - pred
+        sse += err * err
+        level = pred + alpha * err
+        slope = phi * slope + (alpha * beta) * err
+    return sse, level, slope
+
+
+def fit_holt(y_values, damped=False, alphas=ALPHAS, betas=BETAS, phis=PHIS):
+    """계열마다 SSE 가 가장 작은 Holt 모수와 마지막 상태. 각각 (...) 모양의 dict."""
+    y = np.asarray(y_values, dtype=float)
+    batch = y.shape[:-1]
+    grid = np.meshgrid(alphas, betas, phis if damped else [1.0], indexing='ij')
+    alpha, beta, phi = (g.ravel() for g in grid)
+
+    flat = y.reshape(-1, y.shape[-1])
+    pick = np.empty(len(flat), dtype=np.int64)
+    out = np.empty((3, len(flat)))
+    step = max(1, BLOCK_ELEMENTS // len(alpha))   # (계열, 격자) 상태 배열이 캐시에 머물도록 나눔
+    for lo in range(0, len(flat), step):
+        sse, level, slope = _holt_grid(flat[lo:lo + step], alpha, beta, phi)
+        best = np.argmin(sse, axis=1)
+        rows = np.arange(len(best))
+        pick[lo:lo + step] = best
+        out[:, lo:lo + step] = sse[rows, best], level[rows, best], slope[rows, best]
+    return {'alpha': alpha[pick].reshape(batch), 'beta': beta[pick].reshape(batch),
+            'phi': phi[pick].reshape(batch), 'level': out[1].reshape(batch),
+            'slope': out[2].reshape(batch), 'sse': out[0].reshape(batch)}
+
+
+def holt(y_values, years, future_years, damped=False, alphas=ALPHAS, betas=BETAS, phis=PHIS):
+    """Holt 선형 추세 (damped=True 이면 감쇠 추세) 예측."""
+    fit = fit_holt(y_values, damped, alphas, betas, phis)
+    steps = _steps(years, future_years)
+    phi = fit['phi'][..., np.newaxis]
+    # 감쇠 누적 φ + φ² + ... + φ^h (φ = 1 이면 h)
+    damp = np.cumsum(phi ** np.arange(1, steps.max() + 1), axis=-1)[..., steps - 1]
+    return fit['level'][..., np.newaxis] + damp * fit['slope'][..., np.newaxis]
+
+
+def damped_holt(y_values, years, future_years, alphas=ALPHAS, betas=BETAS, phis=PHIS):
+    """감쇠 추세 Holt 예측."""
+    return holt(y_values, years, future_years, True, alphas, betas, phis)
+
+
+# ======================================
+# AR(p)
+# ======================================
+def fit_ar(y_values, max_order=2):
+    """절편 포함 AR(1..max_order) 를 같은 표본으로 적합하고 AICc 로 차수를 고른다.
+
+    반환값의 coef 는 (..., max_order) (선택된 차수 밖은 0), intercept/order 는 (...).
+    """
+    y = np.asarray(y_values, dtype=float)
+    n = y.shape[-1]
+    max_order = min(max_order, n - 5)
+    if max_order < 1:
+        raise ValueError(f"AR 모델에는 {MIN_YEARS['ar']}년 이상의 자료가 필요합니다")
+    batch = y.shape[:-1]
+
+    # Z[..., i, l] = y[..., max_order + i - 1 - l] (시차 1..max_order), 목표 y[..., max_order + i]
+    Z = sliding_window_view(y[..., :-1], max_order, axis=-1)[..., ::-1]
+    target = y[..., max_order:]
+    m = target.shape[-1]
+    z_mean = Z.mean(axis=-2)
+    t_mean = target.mean(axis=-1)
+    A = np.einsum('...ti,...tj->...ij', Z, Z) - m * np.einsum('...i,...j->...ij', z_mean, z_mean)
+    c = np.einsum('...ti,...t->...i', Z, target) - m * z_mean * t_mean[..., np.newaxis]
+    syy = np.einsum('...t,...t->...', target, target) - m * t_mean ** 2
+
+    best = np.full(batch, np.inf)
+    coef = np.zeros(batch + (max_order,))
+    order = np.zeros(batch, dtype=np.int64)
+    for p in range(1, max_order + 1):
+        k = p + 2                                       # 계수 p 개 + 절편 + 분산
+        if m - k - 1 <= 0:
+            break
+        Ap = A[..., :p, :p]
+        scale = np.trace(Ap, axis1=-2, axis2=-1)[..., np.newaxis, np.newaxis]
+        b = np.linalg.solve(Ap + 1e-12 * scale * np.eye(p), c[..., :p, np.newaxis])[..., 0]
+        rss = np.maximum(syy - np.einsum('...i,...i->...', b, c[..., :p]), 1e-12 * np.maximum(syy, 1))
+        aicc = m * np.log(rss / m) + 2 * k + 2 * k * (k + 1) / (m - k - 1)
+        better = aicc < best
+        best = np.where(better, aicc, best)
+        order = np.where(better, p, order)
+        coef = np.where(better[..., np.newaxis], np.pad(b, [(0, 0)] * len(batch) + [(0, max_order - p)]), coef)
+
+    intercept = t_mean - np.einsum('...i,...i->...', coef, z_mean)
+    return {'intercept': intercept, 'coef': coef, 'order': order, 'aicc': best}
+
+
+def autoregressive(y_values, years, future_years, max_order=2):
+    """AR 모델의 다단계 예측 (예측값을 다시 시차로 넣어 반복)."""
+    y = np.asarray(y_values, dtype=float)
+    fit = fit_ar(y, max_order)
+    p = fit['coef'].shape[-1]
+    steps = _steps(years, future_years)
+    history = [y[..., -1 - l] for l in range(p)]      # 최근 값부터 (시차 1, 2, ...)
+    out = []
+    for _ in range(steps.max()):
+        value = fit['intercept'] + sum(fit['coef'][..., l] * history[l] for l in range(p))
+        history = [value] + history[:-1]
+        out.append(value)
+    return np.stack(out, axis=-1)[..., steps - 1]
+
+
+FORECASTERS = {
+    'mean': recent_mean,
+    'trend': predict_future_values,
+    'holt': holt,
+    'damped': damped_holt,
+    'ar': autoregressive,
+}
+
+
+def forecast(method, y_values, years, future_years, **kwargs):
+    """이름으로 고른 예측기로 미래 값을 예측한다."""
+    try:
+        forecaster = FORECASTERS[method]
+    except KeyError:
+        raise ValueError(f"알 수 없는 예측 방식: {method} ({', '.join(FORECASTERS)})") from None
+    return forecaster(y_values, years, future_years, **kwargs)
+
+
+if __name__ == '__main__':
+    from box_model import simulate
+    from data_cache import load_table_2023
+
+    # ======================================
+    # 데이터 읽기 (2023년 데이터 포함)
+    # ======================================
+    table = load_table_2023()
+    years = table['year']
+    fluxes = np.vstack([table['Qin'], table['Qout'], table['P'], table['D']]).astype(float)
+    future_years = np.array([2024, 2025])
+    C0 = 10246565
+
+    for method in FORECASTERS:
+        future = forecast(method, fluxes, years, future_years)
+        dC = simulate(C0, *np.hstack([fluxes, future]))
+        print(f"{method:>6}: " + ", ".join(f"{y}년 {v:,.0f}명" for y, v in zip(future_years, dC[-2:])))
@@ -0,0 +1,208 @@
+import numpy as np
+
+from render import INDICATOR_PANELS, OVERVIEW_PANELS, setup_matplotlib, thousands_formatter
+
+# ======================================
+# 점진적 그림 갱신 (모니터링 화면용)
+# ======================================
+# 241020_2.py 는 실행할 때마다 3x2 서브플롯, 축 서식, 범례를 처음부터 다시 만든다.
+# LiveFigure 는 그림 틀(축, 제목, 서식, 범례, 배치)을 한 번만 만들고, 새 연도나 시나리오가
+# 들어오면 선의 데이터만 바꾼다.
+#
+# 선은 animated 로 두고 전체 그리기 때 배경(축, 눈금, 범례)을 저장해 두었다가
+# 배경 복원 + 선만 다시 그리기 + blit 으로 갱신한다 (블리팅).
+# - 대화형(interactive=True): 현재 백엔드의 창에 blit
+# - 헤드리스(Agg): 같은 방식으로 버퍼를 갱신하고, save() 는 PNG 면 그 버퍼를 바로 쓴다
+#   (SVG/PDF 등 벡터 형식은 savefig 로 전체를 그림)
+#
+# 데이터가 현재 축 범위를 벗어날 때만 여유(headroom)를 두고 범위를 넓혀 전체를 다시 그린다.
+# 그래서 해마다 한 점씩 늘어날 때 대부분의 갱신은 블리팅으로 끝난다.
+#
+# 패널 명세는 render.INDICATOR_PANELS 와 같은 형식
+#     (행, 열, 제목, y축 이름, 천 단위 표시, ((계열 이름, 선 모양), ...))
+
+HEADROOM_YEARS = 3   # x 축을 넓힐 때 미리 확보하는 연도 수
+HEADROOM_Y = 0.25    # y 축을 넓힐 때 미리 확보하는 여유 (데이터 범위 대비)
+HEADROOM_LEVEL = 0.05  # 값 크기 대비 추가 여유 (처음 몇 점은 범위가 좁으므로)
+
+
+class LiveFigure:
+    def __init__(self, panels, shape=(1, 1), figsize=(10, 6), interactive=False, legend=None):
+        setup_matplotlib(None if interactive else 'Agg')
+        if interactive:
+            import matplotlib.pyplot as plt
+            self.fig = plt.figure(figsize=figsize)
+            plt.show(block=False)
+        else:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+            self.fig = Figure(figsize=figsize)
+            FigureCanvasAgg(self.fig)
+        from matplotlib.ticker import MaxNLocator
+
+        self.interactive = interactive
+        self.legend = legend or {}
+        axs = np.atleast_2d(self.fig.subplots(*shape, squeeze=False))
+        self.axes = []
+        self.lines = {}   # 계열 이름 -> [(축, 선)]
+        for row, col, title, ylabel, thousands, lines in panels:
+            ax = axs[row, col]
+            for key, style in lines:
+                self._add(ax, key, style)
+            ax.set_title(title)
+            ax.set_xlabel("시간 (년)")
+            ax.set_ylabel(ylabel)
+            ax.xaxis.set_major_locator(MaxNLocator(integer=True))
+            if thousands:
+                ax.yaxis.set_major_formatter(thousands_formatter())
+            ax.grid(True)
+            self.axes.append(ax)
+            self._legend(ax)
+        for ax in axs.ravel():
+            if ax not in self.axes:
+                ax.axis('off')
+        self.fig.tight_layout()   # 배치는 이때 한 번만
+
+        self._background = None
+        self._stale = True        # 전체를 다시 그려야 하는지
+        self.redraws = 0
+        self.blits = 0
+        self.fig.canvas.mpl_connect('draw_event', self._on_draw)
+
+    @classmethod
+    def indicators(cls, **kwargs):
+        """241020_2.py 의 3x2 지표 그림."""
+        return cls(INDICATOR_PANELS, (3, 2), (18, 15), **kwargs)
+
+    @classmethod
+    def overview(cls, **kwargs):
+        """241020_1.py 의 한 축 7계열 그림."""
+        return cls(OVERVIEW_PANELS, (1, 1), (14, 8), legend=dict(loc='upper left', bbox_to_anchor=(1, 1)),
+                   **kwargs)
+
+    def _add(self, ax, key, style):
+        (line,) = ax.plot([], [], animated=True, **style)
+        self.lines.setdefault(key, []).append((ax, line))
+        return line
+
+    def _legend(self, ax):
+        if any(line.get_label() and not line.get_label().startswith('_')
+               for lines in self.lines.values() for a, line in lines if a is ax):
+            ax.legend(**self.legend)
+
+    def add_line(self, key, panel=0, **style):
+        """새 시나리오 선을 panel 번째 패널에 추가한다 (범례가 바뀌므로 다음 갱신은 전체 그리기)."""
+        ax = self.axes[panel]
+        self._add(ax, key, style)
+        self._legend(ax)
+        self._stale = True
+
+    # ======================================
+    # 갱신
+    # ======================================
+    def update(self, years, **series):
+        """계열 이름=값 으로 선 데이터만 바꾼다. years 는 가장 긴 계열의 x 값."""
+        years = np.asarray(years)
+        for key, values in series.items():
+            values = np.asarray(values, dtype=float)
+            for ax, line in self.lines[key]:
+                line.set_data(years[:len(values)], values)
+                if not self._stale and not self._inside(ax, years[:len(values)], values):
+                    self._stale = True
+        if self._stale:
+            self._rescale()
+        self.draw()
+
+    @staticmethod
+    def _inside(ax, x, y):
+        if not len(x):
+            return True
+        (x0, x1), (y0, y1) = ax.get_xlim(), ax.get_ylim()
+        return x0 <= x.min() and x.max() <= x1 and y0 <= np.nanmin(y) and np.nanmax(y) <= y1
+
+    def _rescale(self):
+        for ax in self.axes:
+            data = [line.get_data() for lines in self.lines.values() for a, line in lines
+                    if a is ax and len(line.get_xdata())]
+            if not data:
+                continue
+            x = np.concatenate([np.asarray(d[0], dtype=float) for d in data])
+            y = np.concatenate([np.asarray(d[1], dtype=float) for d in data])
+            lo, hi = np.nanmin(y), np.nanmax(y)
+            pad = (hi - lo) * HEADROOM_Y + max(abs(lo), abs(hi)) * HEADROOM_LEVEL or 1.0
+            ax.set_xlim(x.min() - 0.5, x.max() + HEADROOM_YEARS + 0.5)
+            ax.set_ylim(lo - pad, hi + pad)
+
+    def draw(self):
+        canvas = self.fig.canvas
+        if self._stale or self._background is None:
+            canvas.draw()         # draw_event -> 배경 저장 + 선 그리기
+            self._stale = False
+            return
+        canvas.restore_region(self._background)
+        self._draw_lines()
+        canvas.blit(self.fig.bbox)
+        canvas.flush_events()
+        self.blits += 1
+
+    def _draw_lines(self):
+        for lines in self.lines.values():
+            for ax, line in lines:
+                ax.draw_artist(line)
+
+    def _on_draw(self, event):
+        if not hasattr(event.canvas, 'copy_from_bbox'):   # savefig 의 벡터 형식 캔버스
+            return
+        self._background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_lines()
+        self.redraws += 1
+
+    def save(self, path):
+        """현재 상태를 파일로 저장한다. PNG 는 (헤드리스에서) 그려 둔 버퍼를 그대로 쓴다."""
+        if not self.interactive and str(path).lower().endswith('.png'):
+            from matplotlib.image import imsave
+
+            if self._stale or self._background is None:
+                self.draw()
+            # 모니터링 화면은 자주 덮어쓰므로 압축보다 속도를 우선
+            imsave(path, np.asarray(self.fig.canvas.buffer_rgba()), pil_kwargs={'compress_level': 1})
+            return
+        self._set_animated(False)
+        try:
+            self.fig.savefig(path)
+        finally:
+            self._set_animated(True)
+            self._stale = True   # savefig 가 캔버스를 다시 그렸으므로 배경을 새로 잡음
+
+    def _set_animated(self, value):
+        for lines in self.lines.values():
+            for _, line in lines:
+                line.set_animated(value)
+
+
+if __name__ == '__main__':
+    import sys
+    import time
+
+    import pandas as pd
+
+    from box_model import simulate
+
+    # 사용법: python live.py [출력 PNG]  -- 한 해씩 자료가 들어오는 상황을 흉내 냄
+    out = sys.argv[1] if len(sys.argv) > 1 else 'indicators_live.png'
+    df = pd.read_csv("BoxBodelData.csv", encoding='euc-kr')
+    series = dict(Qin=df['Qin'].values, Qout=df['Qout'].values, P=df['출생아수(명)'].values,
+                  D=df['사망자수(명)'].values, marriage_husband=df['일반혼인율(남편)'].values,
+                  marriage_wife=df['일반혼인율(아내)'].values)
+    series['dC'] = simulate(5041336 + 5153982 - 93914 + 41514 - 1555281 + 1658928,
+                            series['Qin'], series['Qout'], series['P'], series['D'])
+    years = np.arange(2012, 2012 + len(df))
+
+    start = time.perf_counter()
+    live = LiveFigure.indicators()
+    print(f"틀 만들기: {(time.perf_counter() - start) * 1000:.0f} ms")
+    for n in range(2, len(years) + 1):
+        start = time.perf_counter()
+        live.update(years[:n], **{k: v[:n] for k, v in series.items()})
+        live.save(out)
+        print(f"{years[n - 1]}년까지 갱신 + 저장: {(time.perf_counter() - start) * 1000:.0f} ms")
@@ -0,0 +1,231 @@
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import tempfile
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# ======================================
+# 내용 기반 결과 캐시 (메모이제이션)
+# ======================================
+# 같은 2012~2023 흐름, 같은 C0, 같은 예측 방식으로 simulate/예측/평가를 매번 다시 계산하는
+# 대신, 입력 배열의 내용과 인자를 해시한 키로 결과를 저장해 둔다.
+#
+#   1층: 메모리 LRU  (항목 수와 바이트 수 제한)
+#   2층: 디스크      <dir>/<키 앞 2글자>/<키>.pkl, 전체 크기 제한
+#
+# 두 층 모두 결과를 pickle 한 바이트로 보관하므로 적중할 때마다 새 객체를 돌려준다
+# (호출한 쪽이 결과 배열을 고쳐도 캐시는 그대로). 오래된 항목은 max_age 초가 지나면
+# 버리고, 크기를 넘으면 가장 오래 쓰이지 않은 항목부터 지운다. 디스크 항목의 마지막
+# 사용 시각은 파일의 mtime 이다.
+#
+# memoize() 의 키에는 함수의 바이트코드와 상수의 해시(code_fingerprint)가 들어가므로 함수를
+# 고치면 이전 결과는 더 이상 적중하지 않는다. 함수가 부르는 다른 함수의 변경까지는 알 수 없으므로
+# 그럴 때는 CACHE_VERSION 을 올린다.
+
+CACHE_VERSION = 1
+
+
+# ======================================
+# 키
+# ======================================
+def _update(h, value):
+    if isinstance(value, (np.ndarray, np.generic)):
+        value = np.ascontiguousarray(value)
+        if value.dtype.hasobject:
+            raise TypeError("object 배열은 캐시 키로 쓸 수 없습니다")
+        h.update(b'A' + value.dtype.str.encode() + repr(value.shape).encode())
+        h.update(value.view(np.uint8).reshape(-1) if value.ndim else value.tobytes())
+    elif isinstance(value, (list, tuple)):
+        h.update(b'L%d' % len(value))
+        for item in value:
+            _update(h, item)
+    elif isinstance(value, dict):
+        h.update(b'D%d' % len(value))
+        for key in sorted(value, key=repr):
+            _update(h, key)
+            _update(h, value[key])
+    elif value is None or isinstance(value, (bool, int, float, complex, str, bytes)):
+        h.update(b'S' + type(value).__name__.encode() + repr(value).encode())
+    else:
+        raise TypeError(f"캐시 키로 쓸 수 없는 인자: {type(value).__name__}")
+
+
+def _update_code(h, code):
+    h.update(b'C' + code.co_code + repr(code.co_names).encode())
+    for const in code.co_consts:
+        if hasattr(const, 'co_code'):   # 안쪽 함수/람다
+            _update_code(h, const)
+        else:
+            h.update(b'K' + type(const).__name__.encode() + repr(const).encode())
+
+
+def code_fingerprint(func):
+    """함수 코드(바이트코드, 상수, 참조 이름)의 짧은 해시. 코드 객체가 없으면 빈 문자열."""
+    code = getattr(inspect.unwrap(func), '__code__', None)
+    if code is None:
+        return ''
+    h = hashlib.sha256()
+    _update_code(h, code)
+    return h.hexdigest()[:16]
+
+
+def cache_key(name, *args, **kwargs):
+    """함수 이름과 인자(배열은 dtype/모양/내용)로 만든 sha256 키."""
+    h = hashlib.sha256(b'memo%d:' % CACHE_VERSION + name.encode())
+    _update(h, args)
+    _update(h, kwargs)
+    return h.hexdigest()
+
+
+# ======================================
+# 2층 캐시
+# ======================================
+class MemoCache:
+    def __init__(self, directory=None, memory_items=256, memory_bytes=64 << 20,
+                 disk_bytes=1 << 30, max_age=7 * 24 * 3600):
+        self.directory = directory
+        self.memory_items = memory_items
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.max_age = max_age
+        self._memory = OrderedDict()   # 키 -> (pickle 바이트, 마지막 사용 시각)
+        self._memory_size = 0
+        self._disk_size = None         # 처음 쓸 때 디렉터리를 훑어 계산
+        self.hits = {'memory': 0, 'disk': 0, 'miss': 0}
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.pkl')
+
+    # 메모리 층
+    def _memory_put(self, key, blob, now):
+        if key in self._memory:
+            self._memory_size -= len(self._memory.pop(key)[0])
+        if len(blob) > self.memory_bytes:
+            return
+        self._memory[key] = (blob, now)
+        self._memory_size += len(blob)
+        while len(self._memory) > self.memory_items or self._memory_size > self.memory_bytes:
+            self._memory_size -= len(self._memory.popitem(last=False)[1][0])
+
+    def _memory_get(self, key, now):
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        blob, used = entry
+        if now - used > self.max_age:
+            self._memory_size -= len(self._memory.pop(key)[0])
+            return None
+        self._memory[key] = (blob, now)
+        self._memory.move_to_end(key)
+        return blob
+
+    # 디스크 층
+    def _disk_get(self, key, now):
+        path = self._path(key)
+        try:
+            if now - os.stat(path).st_mtime > self.max_age:
+                return None
+            with open(path, 'rb') as f:
+                blob = f.read()
+            os.utime(path, (now, now))
+        except OSError:
+            return None
+        return blob
+
+    def _disk_put(self, key, blob):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(blob)
+        os.replace(tmp, path)   # 다른 프로세스가 반쯤 쓴 파일을 읽지 않도록
+        if self._disk_size is None:
+            self._disk_size = sum(size for _, _, size in self._disk_entries())
+        else:
+            self._disk_size += len(blob)
+        if self._disk_size > self.disk_bytes:
+            self.evict()
+
+    def _disk_entries(self):
+        if not self.directory or not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for sub in os.scandir(self.directory):
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub.path):
+                if entry.name.endswith('.pkl'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.path, stat.st_size))
+        return entries
+
+    def evict(self, now=None):
+        """디스크에서 기한이 지난 항목을 지우고, 크기 제한까지 오래된 항목부터 지운다."""
+        now = time.time() if now is None else now
+        entries = sorted(self._disk_entries())
+        total = sum(size for _, _, size in entries)
+        for mtime, path, size in entries:
+            if now - mtime <= self.max_age and total <= self.disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        self._disk_size = total
+
+    # 공개 인터페이스
+    def get(self, key):
+        """(적중 여부, 값)."""
+        now = time.time()
+        blob = self._memory_get(key, now)
+        if blob is not None:
+            self.hits['memory'] += 1
+            return True, pickle.loads(blob)
+        if self.directory:
+            blob = self._disk_get(key, now)
+            if blob is not None:
+                self.hits['disk'] += 1
+                self._memory_put(key, blob, now)
+                return True, pickle.loads(blob)
+        self.hits['miss'] += 1
+        return False, None
+
+    def put(self, key, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._memory_put(key, blob, time.time())
+        if self.directory:
+            self._disk_put(key, blob)
+
+    def clear(self):
+        self._memory.clear()
+        self._memory_size = 0
+        for _, path, _ in self._disk_entries():
+            os.remove(path)
+        self._disk_size = 0
+
+    def memoize(self, func, name=None):
+        """func 결과를 이 캐시에 저장하는 래퍼."""
+        name = (name or f"{func.__module__}.{func.__qualname__}") + '@' + code_fingerprint(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = cache_key(name, *args, **kwargs)
+            hit, value = self.get(key)
+            if not hit:
+                value = func(*args, **kwargs)
+                self.put(key, value)
+            return value
+
+        wrapper.cache = self
+        return wrapper
+
+
+def default_directory(data_path="BoxBodelData.csv"):
+    """입력 CSV 옆의 .cache/memo (data_cache 의 컬럼 캐시와 같은 폴더)."""
+    return os.path.join(os.path.dirname(os.path.abspath(data_path)), '.cache', 'memo')
@@ -0,0 +1,108 @@
+import numpy as np
+
+# ======================================
+# 오차 지표 (한 번 훑기 / 청크 누적)
+# ======================================
+# 20241027_3, _4, _5, _7 은 MAE, RMSE, MAPE, 연도별 오차율, 마지막 해 오차를 각각 따로
+# 계산했다. ErrorAccumulator 는 (궤적, 연도) 오차를 청크 단위로 받아 한 번만 훑으면서
+# 연도별 통계량만 남긴다.
+#   - 평균/제곱합: (개수, 평균, M2). 청크 안에서는 청크 평균을 뺀 편차로 M2 를 구하고,
+#     청크끼리는 Chan 의 공식으로 병합한다 (Welford 갱신을 청크 단위로 한 것과 같음)
+#   - 절대 오차 합, 절대 백분율 오차 합, 백분율 오차 합, 최대 절대 오차
+# 작업자마다 따로 누적한 뒤 merge() 로 합칠 수 있으며, 메모리는 연도 수에만 비례한다.
+#
+# 오차의 정의는 스크립트와 같다: 차이 = 모델 예측값 - 실제값, 오차율 = 차이 / 실제값 * 100
+
+
+DEV_ROWS = 4096  # 편차 제곱합을 구할 때 한 번에 만드는 편차 배열의 행 수
+
+
+class ErrorAccumulator:
+    def __init__(self, years):
+        self.count = np.zeros(years)
+        self.mean = np.zeros(years)      # 평균 오차 (편향)
+        self.m2 = np.zeros(years)        # 오차의 편차 제곱합
+        self.abs_sum = np.zeros(years)
+        self.pct_sum = np.zeros(years)
+        self.abs_pct_sum = np.zeros(years)
+        self.max_abs = np.zeros(years)
+
+    def update(self, model, observed):
+        """model (..., years) 과 observed (years,) 또는 같은 모양의 오차를 누적한다."""
+        observed = np.asarray(observed, dtype=float)
+        err = np.asarray(model, dtype=float) - observed
+        err = err.reshape(-1, err.shape[-1])
+        n = err.shape[0]
+        if n == 0:
+            return self
+
+        err_sum = err.sum(axis=0)
+        chunk_mean = err_sum / n
+        # 청크 평균을 뺀 편차 제곱합 (상쇄 오차 없음). 편차 배열은 DEV_ROWS 행씩만 만든다
+        m2 = np.zeros(err.shape[-1])
+        for lo in range(0, n, DEV_ROWS):
+            dev = err[lo:lo + DEV_ROWS] - chunk_mean
+            m2 += np.einsum('ij,ij->j', dev, dev)
+        self._combine(np.full(err.shape[-1], float(n)), chunk_mean, m2)
+
+        if observed.ndim <= 1:
+            # 모든 궤적의 실제값이 같으면 합을 먼저 구하고 나눈다
+            self.pct_sum += err_sum / observed * 100
+            np.abs(err, out=err)  # 이후로 err 는 절대 오차
+            abs_sum = err.sum(axis=0)
+            self.abs_sum += abs_sum
+            self.abs_pct_sum += abs_sum / np.abs(observed) * 100
+        else:
+            # 궤적마다 실제값이 다르면 원소별 오차율을 합산 (임시 배열 없이 einsum 으로)
+            inverse = 100 / np.broadcast_to(observed, np.broadcast_shapes(observed.shape, np.shape(model)))
+            inverse = inverse.reshape(err.shape)
+            self.pct_sum += np.einsum('ij,ij->j', err, inverse)
+            np.abs(err, out=err)
+            np.abs(inverse, out=inverse)
+            self.abs_sum += err.sum(axis=0)
+            self.abs_pct_sum += np.einsum('ij,ij->j', err, inverse)
+        np.maximum(self.max_abs, err.max(axis=0), out=self.max_abs)
+        return self
+
+    def _combine(self, n_b, mean_b, m2_b):
+        n_a = self.count
+        n = n_a + n_b
+        delta = mean_b - self.mean
+        safe = np.where(n > 0, n, 1.0)
+        self.mean = self.mean + delta * n_b / safe
+        self.m2 = self.m2 + m2_b + delta ** 2 * n_a * n_b / safe
+        self.count = n
+
+    def merge(self, other):
+        """다른 작업자의 누적값을 합친다."""
+        self._combine(other.count, other.mean, other.m2)
+        self.abs_sum += other.abs_sum
+        self.pct_sum += other.pct_sum
+        self.abs_pct_sum += other.abs_pct_sum
+        np.maximum(self.max_abs, other.max_abs, out=self.max_abs)
+        return self
+
+    def result(self):
+        """누적된 오차 지표. 연도별 값은 (years,) 배열이다."""
+        total = self.count.sum()
+        sq_sum = self.m2 + self.count * self.mean ** 2   # 연도별 오차 제곱합
+        n = np.where(self.count > 0, self.count, 1.0)
+        return {
+            'MAE': self.abs_sum.sum() / total,
+            'RMSE': np.sqrt(sq_sum.sum() / total),
+            'MAPE': self.abs_pct_sum.sum() / total,
+            'bias': np.sum(self.mean * self.count) / total,
+            'max_error': self.max_abs.max(),
+            'year_error': self.mean,                      # 연도별 평균 오차
+            'year_error_rate': self.pct_sum / n,          # 연도별 평균 오차율 (%)
+            'year_RMSE': np.sqrt(sq_sum / n),
+            'last_error': self.mean[-1],
+            'last_error_rate': self.pct_sum[-1] / n[-1],
+            'count': total,
+        }
+
+
+def error_metrics(model, observed):
+    """궤적 하나(또는 작은 배열)의 지표를 바로 계산한다."""
+    observed = np.asarray(observed, dtype=float)
+    return ErrorAccumulator(observed.shape[-1]).update(model, observed).result()
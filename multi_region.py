@@ -0,0 +1,61 @@
+import numpy as np
+from scipy import sparse
+
+# ======================================
+# 다지역 N-box 모델
+# ======================================
+# 지역 i 의 인구 C_i 에 대해
+#     C_i[t] = C_i[t-1] + (Σ_j R_ij C_j[t-1] - Σ_j R_ji C_i[t-1] + Qin_i - Qout_i + P_i - D_i) * dt
+# R_ij 는 지역 j -> 지역 i 로의 연간 이동률(출발지 인구 대비).
+# 이동률 항은 희소 전이행렬 T = I + dt * (R - diag(R 의 열 합)) 로 묶어서
+# 매년 희소 행렬-벡터 곱 한 번으로 전체 지역을 계산한다.
+#
+# Qin/Qout 는 모델 밖(국외 등)과의 전입/전출 인원수로, 지역이 하나이고 R 이 비어 있으면
+# box_model.simulate() 와 같은 결과가 된다.
+
+
+def migration_rates(origin, dest, flow, population, n_regions):
+    """출발지-도착지 이동 인원수를 이동률 희소행렬 R (CSR, R[dest, origin]) 로 변환한다.
+
+    origin, dest 는 지역 번호(0 ~ n_regions-1), flow 는 해당 쌍의 연간 이동 인원수,
+    population 은 기준 연도의 지역별 인구수.
+    """
+    origin = np.asarray(origin, dtype=np.int64)
+    dest = np.asarray(dest, dtype=np.int64)
+    population = np.asarray(population, dtype=float)
+    rate = np.asarray(flow, dtype=float) / population[origin]
+    keep = origin != dest  # 지역 내 이동은 인구 변화가 없음
+    R = sparse.coo_matrix((rate[keep], (dest[keep], origin[keep])), shape=(n_regions, n_regions))
+    return R.tocsr()  # 중복된 (origin, dest) 쌍은 합산됨
+
+
+def transition_matrix(R, dt=1):
+    """이동률 행렬 R 로부터 한 스텝 전이행렬 T = I + dt * (R - diag(colsum R)) 을 만든다."""
+    R = sparse.csr_matrix(R, dtype=float)
+    outflow = np.asarray(R.sum(axis=0)).ravel()
+    T = sparse.identity(R.shape[0], format='csr') + (R - sparse.diags(outflow)) * dt
+    return T.tocsr()
+
+
+def simulate_regions(C0, T, P, D, Qin=0, Qout=0, dt=1):
+    """N-box 모델을 적분한다.
+
+    C0 는 (N,) 또는 시나리오별 (N, S) 초기 인구수, T 는 transition_matrix() 결과
+    (연도별로 다르면 행렬의 리스트). P, D, Qin, Qout 은 마지막 축이 연도인 인원수 배열로
+    (N, years) 또는 (N, S, years) 이며, 시나리오 간 공통이면 (N, 1, years) 로 넘긴다.
+    반환값은 (N, years) 또는 (N, S, years) 이다.
+    """
+    C0 = np.asarray(C0, dtype=float)
+    source = np.asarray(Qin, dtype=float) - np.asarray(Qout, dtype=float) \
+        + (np.asarray(P, dtype=float) - np.asarray(D, dtype=float))
+    time = source.shape[-1]
+    # (years, N[, S]) 로 바꿔 한 해의 값이 연속되도록 함
+    source = np.moveaxis(np.broadcast_to(source, C0.shape + (time,)), -1, 0)
+
+    out = np.empty((time,) + C0.shape)
+    out[0] = C0
+    for t in range(1, time):
+        step = T[t - 1] if isinstance(T, list) else T
+        out[t] = step @ out[t - 1]
+        out[t] += source[t - 1] * dt
+    return np.moveaxis(out, 0, -1)
@@ -0,0 +1,244 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+# ======================================
+# 단계별 프로파일링 / 추적
+# ======================================
+# CSV 읽기, 예측(회귀 적합), 적분, 지표 계산, 그림 저장 중 어디에 시간이 드는지 보기 위해
+# 단계(stage)마다 벽시계 시간, CPU 시간, 최대 메모리를 기록한다.
+#
+#     import profiling
+#     profiling.enable()
+#     with profiling.stage('simulate', scenarios=1000):
+#         ...
+#     profiling.export_json('profile.json')
+#     profiling.export_chrome('profile.trace.json')   # chrome://tracing, Perfetto 에서 열기
+#
+# 꺼져 있을 때 stage() 는 아무것도 하지 않는 공용 객체를 돌려주므로 비용은 플래그 확인
+# 한 번뿐이다. 프로세스 풀 작업은 task() 로 감싸고 결과를 gather() 로 받으면 작업자에서
+# 기록한 단계가 (작업자 pid 와 함께) 부모로 모인다.
+#
+# 메모리 측정 방식:
+#   'rss'         프로세스 최대 RSS (resource 모듈, 단계가 끝날 때까지의 최고값)
+#   'tracemalloc' 단계 안에서 Python/numpy 가 할당한 최대 바이트 (정확하지만 느림)
+#   None          측정하지 않음
+
+_enabled = False
+_memory = None
+_epoch_ns = 0
+_events = []
+_local = threading.local()
+
+
+def enabled():
+    return _enabled
+
+
+def enable(memory='rss', epoch_ns=None):
+    """기록을 켠다. epoch_ns 는 추적 시각의 기준 (작업자는 부모의 값을 받음)."""
+    global _enabled, _memory, _epoch_ns
+    if memory == 'tracemalloc':
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+    _memory = memory
+    _epoch_ns = time.perf_counter_ns() if epoch_ns is None else epoch_ns
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+    if _memory == 'tracemalloc':
+        import tracemalloc
+        tracemalloc.stop()
+
+
+def events():
+    return list(_events)
+
+
+def reset():
+    _events.clear()
+
+
+def _max_rss():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024   # macOS 는 바이트, Linux 는 KB
+
+
+# ======================================
+# 단계
+# ======================================
+class _Stage:
+    __slots__ = ('name', 'args', 'start', 'cpu', 'mem_start', 'peak')
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        stack = _local.__dict__.setdefault('stack', [])
+        if _memory == 'tracemalloc':
+            import tracemalloc
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, peak)   # 안쪽 단계가 최고값을 초기화하기 전에 보관
+            tracemalloc.reset_peak()
+            self.mem_start = self.peak = current
+        stack.append(self)
+        self.cpu = time.process_time()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        cpu = time.process_time() - self.cpu
+        stack = _local.stack
+        stack.pop()
+        memory = None
+        if _memory == 'tracemalloc':
+            import tracemalloc
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            memory = self.peak - self.mem_start
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, self.peak)
+        elif _memory == 'rss':
+            memory = _max_rss()
+        _events.append({
+            'name': self.name, 'pid': os.getpid(), 'tid': threading.get_ident(),
+            'depth': len(stack), 'start': (self.start - _epoch_ns) / 1e9, 'wall': (end - self.start) / 1e9,
+            'cpu': cpu, 'memory': memory, 'args': self.args,
+        })
+        return False
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name, **args):
+    """with 문으로 감싼 구간을 단계 name 으로 기록한다 (꺼져 있으면 아무것도 안 함)."""
+    if not _enabled:
+        return _NO_STAGE
+    return _Stage(name, args)
+
+
+def traced(name=None):
+    """함수 호출 전체를 단계로 기록하는 데코레이터."""
+    def decorate(func):
+        label = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Stage(label, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# ======================================
+# 프로세스 풀 작업
+# ======================================
+class _Task:
+    # 작업자에서 func 를 단계로 기록하고 (결과, 작업자 기록) 을 돌려준다
+    def __init__(self, func, name, memory, epoch_ns, parent):
+        self.func = func
+        self.name = name
+        self.memory = memory
+        self.epoch_ns = epoch_ns
+        self.parent = parent
+
+    def __call__(self, *args):
+        if os.getpid() == self.parent:    # 부모 프로세스에서 바로 실행된 경우
+            with _Stage(self.name, {}):
+                return self.func(*args), []
+        if not _enabled:
+            enable(self.memory, self.epoch_ns)
+        first = len(_events)
+        with _Stage(self.name, {}):
+            result = self.func(*args)
+        recorded = _events[first:]
+        del _events[first:]
+        return result, recorded
+
+
+def task(func, name=None):
+    """프로세스 풀에 넘길 함수를 감싼다. 꺼져 있으면 func 를 그대로 돌려준다."""
+    if not _enabled:
+        return func
+    return _Task(func, name or f"{func.__module__}.{func.__qualname__}", _memory, _epoch_ns, os.getpid())
+
+
+def gather(results):
+    """task() 로 감싼 작업의 결과를 풀어 주고 작업자 기록을 모은다."""
+    if not _enabled:
+        yield from results
+        return
+    for result, recorded in results:
+        _events.extend(recorded)
+        yield result
+
+
+# ======================================
+# 요약 / 내보내기
+# ======================================
+def summary():
+    """(단계, pid) 별 호출 수, 벽시계/CPU 시간 합계, 최대 메모리."""
+    table = {}
+    for e in _events:
+        row = table.setdefault((e['name'], e['pid']), {
+            'name': e['name'], 'pid': e['pid'], 'calls': 0, 'wall': 0.0, 'cpu': 0.0, 'memory': None})
+        row['calls'] += 1
+        row['wall'] += e['wall']
+        row['cpu'] += e['cpu']
+        if e['memory'] is not None:
+            row['memory'] = max(row['memory'] or 0, e['memory'])
+    return sorted(table.values(), key=lambda r: -r['wall'])
+
+
+def export_json(path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'memory': _memory, 'summary': summary(), 'events': _events},
+                  f, ensure_ascii=False, indent=1, default=str)
+
+
+def export_chrome(path):
+    """Chrome trace-event 형식 (완료 이벤트 'X', 시각 단위는 마이크로초)."""
+    trace = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': 'main' if pid == os.getpid()
+                                                                      else f'worker {pid}'}}
+             for pid in sorted({e['pid'] for e in _events})]
+    for e in _events:
+        args = dict(e['args'], cpu_ms=e['cpu'] * 1e3)
+        if e['memory'] is not None:
+            args['memory_bytes'] = e['memory']
+        trace.append({'name': e['name'], 'ph': 'X', 'pid': e['pid'], 'tid': e['tid'],
+                      'ts': e['start'] * 1e6, 'dur': e['wall'] * 1e6, 'args': args})
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False, default=str)
+
+
+def print_summary(file=sys.stderr):
+    for row in summary():
+        memory = f"{row['memory'] / 2 ** 20:8.1f} MB" if row['memory'] is not None else ''
+        print(f"{row['name']:<32} pid {row['pid']:>7} x{row['calls']:<4} "
+              f"벽시계 {row['wall'] * 1e3:9.2f} ms  CPU {row['cpu'] * 1e3:9.2f} ms  {memory}", file=file)
@@ -0,0 +1,201 @@
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import profiling
+
+# ======================================
+# 헤드리스 일괄 그림 저장
+# ======================================
+# 스크립트들은 그림을 하나씩 만들고 plt.show() 로 끝나며, 시작할 때마다
+# 'C:/Windows/Fonts/NanumGothic.ttf' 를 찾는다. 여기서는
+#   - Agg 백엔드로 화면 없이 그리고
+#   - 한글 폰트를 한 번만 찾아 캐시하며 (Linux 경로도 확인)
+#   - 여러 그림을 프로세스 풀에 나누어 PNG/SVG 로 바로 저장한다.
+#
+# 그림 작업은 (그리기 함수, 인자 dict, 저장 경로 또는 경로 리스트) 튜플이다.
+# 그리기 함수는 모듈 최상위 함수여야 하며 (fig, **kwargs) 를 받아 fig 에 그린다.
+
+FONT_ENV = 'BOXMODEL_FONT'  # 폰트 파일 경로를 직접 지정할 때 쓰는 환경 변수
+
+FONT_CANDIDATES = (
+    'C:/Windows/Fonts/NanumGothic.ttf',
+    'C:/Windows/Fonts/malgun.ttf',
+    '/usr/share/fonts/truetype/nanum/NanumGothic.ttf',
+    '/usr/share/fonts/nanum/NanumGothic.ttf',
+    '/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc',
+    '/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc',
+    '/usr/share/fonts/google-noto-cjk/NotoSansCJK-Regular.ttc',
+    '/System/Library/Fonts/Supplemental/AppleGothic.ttf',
+)
+
+FONT_FAMILIES = ('NanumGothic', 'Malgun Gothic', 'Noto Sans CJK KR', 'AppleGothic')
+
+# 241020_2.py 의 3x2 패널: (행, 열, 제목, y축 이름, 천 단위 표시, ((계열 이름, 선 모양), ...))
+INDICATOR_PANELS = (
+    (0, 0, "모델 인구수", "인구수 (명)", True,
+     (('dC', dict(color='k', marker='o', linestyle='-')),)),
+    (0, 1, "전입 및 전출", "인구수 (명)", True,
+     (('Qin', dict(color='blue', marker='^', linestyle='--', label='전입(Qin)')),
+      ('Qout', dict(color='red', marker='v', linestyle='--', label='전출(Qout)')))),
+    (1, 0, "출생아수 및 사망자수", "인구수 (명)", True,
+     (('P', dict(color='green', marker='s', linestyle='-.', label='출생아수(P)')),
+      ('D', dict(color='purple', marker='D', linestyle='-.', label='사망자수(D)')))),
+    (1, 1, "일반혼인율 (남편)", "혼인율 (%)", False,
+     (('marriage_husband', dict(color='orange', marker='o', linestyle=':', label='일반혼인율(남편)')),)),
+    (2, 0, "일반혼인율 (아내)", "혼인율 (%)", False,
+     (('marriage_wife', dict(color='brown', marker='x', linestyle=':', label='일반혼인율(아내)')),)),
+)
+
+# 241020_1.py 의 한 축에 그린 7개 계열
+OVERVIEW_PANELS = (
+    (0, 0, "1D BOX MODEL 및 보조 지표", "인구수 (명)", True,
+     (('dC', dict(color='k', marker='o', linestyle='-', label='모델 인구수')),)
+     + INDICATOR_PANELS[1][5] + INDICATOR_PANELS[2][5] + INDICATOR_PANELS[3][5] + INDICATOR_PANELS[4][5]),
+)
+
+
+@functools.lru_cache(maxsize=None)
+def korean_font():
+    """사용할 한글 폰트 이름을 찾아 등록한다. 없으면 None (기본 폰트 사용)."""
+    from matplotlib import font_manager
+
+    paths = [os.environ.get(FONT_ENV)] + list(FONT_CANDIDATES)
+    for path in paths:
+        if path and os.path.exists(path):
+            font_manager.fontManager.addfont(path)
+            return font_manager.FontProperties(fname=path).get_name()
+
+    installed = {f.name for f in font_manager.fontManager.ttflist}
+    for family in FONT_FAMILIES:
+        if family in installed:
+            return family
+    return None
+
+
+def setup_matplotlib(backend='Agg'):
+    """백엔드와 한글 폰트를 설정한다. pyplot 을 import 하기 전에 호출한다."""
+    import matplotlib
+
+    if backend:  # None 이면 현재(대화형) 백엔드를 그대로 사용
+        matplotlib.use(backend)
+    font_name = korean_font()
+    if font_name:
+        matplotlib.rcParams['font.family'] = font_name
+    # 마이너스 기호 깨짐 방지
+    matplotlib.rcParams['axes.unicode_minus'] = False
+
+
+def thousands_formatter():
+    from matplotlib import ticker
+
+    # y축 천 단위 콤마 표시
+    return ticker.FuncFormatter(lambda x, p: format(int(x), ','))
+
+
+# ======================================
+# 그리기 함수
+# ======================================
+def population_figure(fig, years, dC, new_dC=None, title="1D BOX MODEL 및 실제 지표 비교"):
+    """모델 인구수(와 실제 인구수) 비교 그림 (20241027*.py)."""
+    fig.set_size_inches(10, 6)
+    ax = fig.add_subplot()
+    ax.plot(years, dC, color='k', marker='o', linestyle='-', label='모델 인구수')
+    if new_dC is not None:
+        ax.plot(years[:len(new_dC)], new_dC, color='r', marker='x', linestyle='--', label='실제 인구수')
+    ax.set_title(title)
+    ax.set_xlabel("시간 (년)")
+    ax.set_ylabel("인구수 (명)")
+    ax.yaxis.set_major_formatter(thousands_formatter())
+    ax.grid(True)
+    ax.set_xticks(years)
+    ax.legend()
+    fig.tight_layout()
+
+
+def indicators_grid(fig, years, dC, Qin, Qout, P, D, marriage_husband, marriage_wife):
+    """모델 인구수와 보조 지표 3x2 그림 (241020_2.py)."""
+    fig.set_size_inches(18, 15)
+    axs = fig.subplots(3, 2)
+    series = dict(dC=dC, Qin=Qin, Qout=Qout, P=P, D=D,
+                  marriage_husband=marriage_husband, marriage_wife=marriage_wife)
+
+    for row, col, title, ylabel, thousands, lines in INDICATOR_PANELS:
+        ax = axs[row, col]
+        for key, style in lines:
+            ax.plot(years, series[key], **style)
+        ax.set_title(title)
+        ax.set_xlabel("시간 (년)")
+        ax.set_ylabel(ylabel)
+        if thousands:
+            ax.yaxis.set_major_formatter(thousands_formatter())
+        ax.grid(True)
+        if any('label' in style for _, style in lines):
+            ax.legend()
+
+    # 여섯 번째 서브플롯: 빈 공간 (추가 지표를 위한 공간)
+    axs[2, 1].axis('off')
+    fig.tight_layout()
+
+
+# ======================================
+# 일괄 저장
+# ======================================
+def render(job):
+    """그림 하나를 그려 저장하고 저장한 경로 리스트를 반환한다."""
+    from matplotlib.figure import Figure
+
+    draw, kwargs, paths = job
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    fig = Figure()  # pyplot 을 거치지 않으므로 전역 상태/창 관리가 없음
+    draw(fig, **kwargs)
+    for path in paths:
+        fig.savefig(path)  # 확장자(.png/.svg)로 형식 결정
+    return [os.fspath(p) for p in paths]
+
+
+def render_all(jobs, workers=None):
+    """그림 작업들을 프로세스 풀에서 병렬로 저장한다."""
+    jobs = list(jobs)
+    workers = workers or os.cpu_count() or 1
+    run = profiling.task(render, 'render')
+    if workers == 1 or len(jobs) <= 1:
+        setup_matplotlib()
+        return list(profiling.gather(map(run, jobs)))
+    with ProcessPoolExecutor(max_workers=workers, initializer=setup_matplotlib) as pool:
+        return list(profiling.gather(pool.map(run, jobs, chunksize=max(1, len(jobs) // (4 * workers)))))
+
+
+if __name__ == '__main__':
+    import sys
+
+    import pandas as pd
+
+    from box_model import simulate
+
+    # 사용법: python render.py [출력 폴더]
+    out_dir = sys.argv[1] if len(sys.argv) > 1 else 'figures'
+    os.makedirs(out_dir, exist_ok=True)
+
+    df = pd.read_csv("BoxBodelData.csv", encoding='euc-kr')
+    C0 = 5041336 + 5153982 - 93914 + 41514 - 1555281 + 1658928
+    Qin, Qout = df['Qin'].values, df['Qout'].values
+    P, D = df['출생아수(명)'].values, df['사망자수(명)'].values
+    dC = simulate(C0, Qin, Qout, P, D)
+    new_dC = (df['남자인구수 (명)'] + df['여자인구수 (명)'] - df['출생아수(명)'] + df['사망자수(명)']
+              - df['Qin'] + df['Qout']).values
+    years = np.arange(2012, 2012 + len(df))
+
+    jobs = [
+        (population_figure, dict(years=years, dC=dC, new_dC=new_dC),
+         [os.path.join(out_dir, 'population.png'), os.path.join(out_dir, 'population.svg')]),
+        (indicators_grid, dict(years=years, dC=dC, Qin=Qin, Qout=Qout, P=P, D=D,
+                               marriage_husband=df['일반혼인율(남편)'].values,
+                               marriage_wife=df['일반혼인율(아내)'].values),
+         os.path.join(out_dir, 'indicators.png')),
+    ]
+    for paths in render_all(jobs):
+        print(", ".join(paths))
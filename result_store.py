@@ -0,0 +1,190 @@
+import numpy as np
+
+# ======================================
+# 시뮬레이션 결과 저장소 (HDF5)
+# ======================================
+# dC, new_dC, 예측값, 평가 지표는 지금까지 그림 창을 닫으면 사라졌다. ResultStore 는
+# 실행(run) 별로 다음을 하나의 HDF5 파일에 저장한다.
+#
+#   /runs/<run_id>/trajectories   (지역, 시나리오, 연도) 인구수, 청크 + gzip 압축
+#   /runs/<run_id>/years          연도
+#   /runs/<run_id>/regions        지역 이름
+#   /runs/<run_id>/forecasts/<이름>  예측값 (지역, 시나리오, 예측 연도)
+#   /runs/<run_id>/metrics/<이름>    평가 지표 (스칼라 또는 배열)
+#
+# 청크는 (지역 1개, 시나리오 여러 개, 전체 연도) 이므로 한 지역만 읽을 때는 그 지역의
+# 청크만 풀어서 읽는다. 큰 앙상블은 create_run() 후 append() 로 시나리오를 이어 쓴다.
+# h5py 는 이 모듈을 쓸 때만 필요하다.
+
+CHUNK_BYTES = 1 << 20  # 청크 하나의 목표 크기 (1MB)
+
+
+def _h5py():
+    try:
+        import h5py
+    except ImportError as e:
+        raise ImportError("결과 저장소에는 h5py 가 필요합니다 (pip install h5py)") from e
+    return h5py
+
+
+class ResultStore:
+    def __init__(self, path, mode='a', compression='gzip', level=4):
+        self.file = _h5py().File(path, mode)
+        self.compression = compression
+        self.level = level
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.file.close()
+
+    def runs(self):
+        return list(self.file.get('runs', {}))
+
+    def _group(self, run_id):
+        return self.file['runs'][str(run_id)]
+
+    # ======================================
+    # 쓰기
+    # ======================================
+    def create_run(self, run_id, years, regions, dtype='f8', attrs=None, expected_scenarios=None):
+        """빈 실행을 만든다. 시나리오 축은 append() 로 늘어난다."""
+        years = np.asarray(years)
+        group = self.file.require_group('runs').create_group(str(run_id))
+        group['years'] = years
+        group['regions'] = np.asarray([str(r) for r in regions], dtype=object) \
+            .astype(_h5py().string_dtype())
+        chunk = max(1, CHUNK_BYTES // (np.dtype(dtype).itemsize * max(len(years), 1)))
+        if expected_scenarios:
+            chunk = min(chunk, expected_scenarios)
+        group.create_dataset('trajectories', shape=(len(regions), 0, len(years)),
+                             maxshape=(len(regions), None, len(years)), dtype=dtype,
+                             chunks=(1, chunk, len(years)), compression=self.compression,
+                             compression_opts=self.level, shuffle=True)
+        group.attrs.update(attrs or {})
+        return group
+
+    def append(self, run_id, trajectories):
+        """(지역, 시나리오 블록, 연도) 궤적을 시나리오 축 뒤에 이어 쓴다."""
+        ds = self._group(run_id)['trajectories']
+        block = np.asarray(trajectories)
+        block = block.reshape((ds.shape[0], -1, ds.shape[2]))
+        start = ds.shape[1]
+        ds.resize(start + block.shape[1], axis=1)
+        ds[:, start:start + block.shape[1], :] = block
+        return start
+
+    def write_run(self, run_id, trajectories, years, regions=None, forecasts=None,
+                  forecast_years=None, metrics=None, attrs=None, dtype='f8'):
+        """실행 하나를 한 번에 저장한다. trajectories 는 (연도,), (시나리오, 연도) 또는
+        (지역, 시나리오, 연도)."""
+        trajectories = np.asarray(trajectories)
+        if trajectories.ndim == 1:
+            trajectories = trajectories[np.newaxis, np.newaxis]
+        elif trajectories.ndim == 2:
+            trajectories = trajectories[np.newaxis]
+        regions = regions if regions is not None else [str(i) for i in range(trajectories.shape[0])]
+        self.create_run(run_id, years, regions, dtype, attrs, trajectories.shape[1])
+        self.append(run_id, trajectories)
+        if forecasts:
+            self.write_forecasts(run_id, forecasts, forecast_years)
+        if metrics:
+            self.write_metrics(run_id, metrics)
+
+    def write_forecasts(self, run_id, forecasts, forecast_years=None):
+        group = self._group(run_id).require_group('forecasts')
+        if forecast_years is not None:
+            group.attrs['years'] = np.asarray(forecast_years)
+        for name, values in forecasts.items():
+            values = np.asarray(values)
+            if name in group:   # write_metrics 와 같이 같은 이름은 새 값으로 바꿈
+                del group[name]
+            group.create_dataset(name, data=values, compression=self.compression,
+                                 compression_opts=self.level, shuffle=True,
+                                 chunks=True if values.ndim else None)
+
+    def write_metrics(self, run_id, metrics):
+        group = self._group(run_id).require_group('metrics')
+        for name, value in metrics.items():
+            if name in group:
+                del group[name]
+            group[name] = np.asarray(value)
+
+    # ======================================
+    # 읽기
+    # ======================================
+    def region_index(self, run_id, region):
+        if isinstance(region, (int, np.integer)):
+            return int(region)
+        names = self._group(run_id)['regions'].asstr()[:]
+        match = np.flatnonzero(names == str(region))
+        if not len(match):
+            raise KeyError(f"{run_id} 에 없는 지역: {region}")
+        return int(match[0])
+
+    def read(self, run_id, region=None, scenarios=slice(None), years=None):
+        """필요한 조각만 읽는다. region 은 지역 이름 또는 번호 (None 이면 전체)."""
+        group = self._group(run_id)
+        ds = group['trajectories']
+        r = slice(None) if region is None else self.region_index(run_id, region)
+        if years is None:
+            return ds[r, scenarios, :]
+        stored = group['years'][:]
+        wanted = np.atleast_1d(years)
+        missing = wanted[~np.isin(wanted, stored)]
+        if len(missing):
+            raise KeyError(f"{run_id} 에 없는 연도: {missing.tolist()}")
+        t = np.array([np.flatnonzero(stored == y)[0] for y in wanted])
+        if np.ndim(years) == 0:
+            return ds[r, scenarios, int(t[0])]
+        # h5py 는 증가하는 번호 목록 하나만 받으므로 정렬된 고유 번호로 읽고 요청 순서로 되돌린다
+        unique, inverse = np.unique(t, return_inverse=True)
+        if isinstance(scenarios, slice):
+            return ds[r, scenarios, unique][..., inverse]
+        return ds[r, scenarios, int(unique[0]):int(unique[-1]) + 1][..., unique[inverse] - unique[0]]
+
+    def forecasts(self, run_id, name, region=None, scenarios=slice(None)):
+        ds = self._group(run_id)['forecasts'][name]
+        if ds.ndim < 2:
+            return ds[()]
+        r = slice(None) if region is None else self.region_index(run_id, region)
+        return ds[r, scenarios]
+
+    def metrics(self, run_id):
+        group = self._group(run_id).get('metrics', {})
+        return {name: group[name][()] for name in group}
+
+    def years(self, run_id):
+        return self._group(run_id)['years'][:]
+
+    def attrs(self, run_id):
+        return dict(self._group(run_id).attrs)
+
+
+if __name__ == '__main__':
+    from box_model import observed_population, simulate
+    from data_cache import load_table_2023
+    from metrics import error_metrics
+
+    # ======================================
+    # 데이터 읽기 (2023년 데이터 포함) 후 결과 저장
+    # ======================================
+    table = load_table_2023()
+    years = table['year']
+    Qin, Qout, P, D = table['Qin'], table['Qout'], table['P'], table['D']
+
+    new_dC = observed_population(table['male'], table['female'], Qin, Qout, P, D)
+    dC = simulate(new_dC[0], Qin, Qout, P, D)
+
+    with ResultStore("results.h5") as store:
+        run_id = f"box_{len(store.runs())}"
+        store.write_run(run_id, np.stack([dC, new_dC]), years, regions=['서울'],
+                        metrics=error_metrics(dC, new_dC),
+                        attrs={'C0': new_dC[0], 'rows': 'model, observed'})
+        print(f"{run_id}: 저장된 실행 {store.runs()}")
+        print("2023년 모델/실제:", store.read(run_id, region='서울', years=2023))
+        print("RMSE:", store.metrics(run_id)['RMSE'])
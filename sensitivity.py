@@ -0,0 +1,186 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+import profiling
+from box_model import simulate
+from trend import predict_future_values
+
+# ======================================
+# 전역 민감도 분석 (Sobol / Morris)
+# ======================================
+# 예측 오차가 인구 이동(Qin/Qout) 때문인지 출생/사망(P/D) 때문인지 알아보기 위해
+# 네 흐름의 곱셈 교란, C0 교란, 예측 방식(최근 3년 평균 / 선형 추세)을 입력 인자로 두고
+#   - Sobol: Saltelli 표본 설계, 1차/총 효과 지수와 부트스트랩 신뢰구간
+#   - Morris: 궤적 기반 elementary effect 의 mu, mu*, sigma
+# 를 계산한다. 모델 평가는 표본 행렬을 청크로 나누어 프로세스 풀에서 일괄 박스 모델로 한다.
+#
+# 모델 함수는 (N, k) 인자 행렬을 받아 (N,) 출력을 돌려주는 모듈 최상위 함수
+# (또는 그 partial) 여야 한다. 인자 값은 [0, 1) 에서 뽑아 bounds 로 변환해서 넘긴다.
+
+FACTORS = ('Qin', 'Qout', 'P', 'D', 'C0', 'method')
+
+DEFAULT_BOUNDS = np.array([
+    [0.9, 1.1],    # Qin 배율
+    [0.9, 1.1],    # Qout 배율
+    [0.9, 1.1],    # P 배율
+    [0.9, 1.1],    # D 배율
+    [0.99, 1.01],  # C0 배율
+    [0.0, 1.0],    # 예측 방식: < 0.5 이면 최근 3년 평균, 아니면 선형 추세
+])
+
+
+# ======================================
+# 모델: 마지막 horizon 년을 남겨 두고 예측했을 때의 오차
+# ======================================
+def forecast_error(params, history, observed, horizon=2, window=3):
+    """(N, 6) 인자에 대한 마지막 해 예측의 절대 백분율 오차 (N,).
+
+    history 는 (4, years) 관측 흐름 (Qin, Qout, P, D), observed 는 (years,) 실제 인구수(new_dC).
+    앞쪽 years - horizon 년의 흐름으로 나머지 horizon 년을 예측해 적분한다.
+    """
+    params = np.asarray(params, dtype=float)
+    history = np.asarray(history, dtype=float)
+    n = history.shape[1]
+    fit = n - horizon
+
+    flux = history[np.newaxis, :, :fit] * params[:, :4, np.newaxis]   # (N, 4, fit)
+    mean = np.repeat(flux[..., -window:].mean(axis=-1, keepdims=True), horizon, axis=-1)
+    years = np.arange(fit)
+    trend = predict_future_values(flux, years, np.arange(fit, n))
+    use_trend = (params[:, 5] >= 0.5)[:, np.newaxis, np.newaxis]
+    future = np.where(use_trend, trend, mean)
+
+    full = np.concatenate([flux, future], axis=-1)
+    dC = simulate(observed[0] * params[:, 4], full[:, 0], full[:, 1], full[:, 2], full[:, 3])
+    return np.abs(dC[:, -1] - observed[-1]) / observed[-1] * 100
+
+
+# ======================================
+# 병렬 평가
+# ======================================
+def evaluate(model, X, workers=None, chunk_size=50_000):
+    """인자 행렬 X (N, k) 를 청크로 나누어 model 을 병렬 평가한다."""
+    chunks = [X[lo:lo + chunk_size] for lo in range(0, len(X), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    run = profiling.task(model, 'sensitivity.evaluate')
+    if workers == 1 or len(chunks) == 1:
+        return np.concatenate(list(profiling.gather(map(run, chunks))))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return np.concatenate(list(profiling.gather(pool.map(run, chunks))))
+
+
+def _base_sample(n, k, seed, sampler):
+    if sampler == 'sobol':
+        from scipy.stats import qmc
+        return qmc.Sobol(k, scramble=True, seed=seed).random(n)
+    return np.random.default_rng(seed).random((n, k))
+
+
+def _scale(u, bounds):
+    bounds = np.asarray(bounds, dtype=float)
+    return bounds[:, 0] + u * (bounds[:, 1] - bounds[:, 0])
+
+
+# ======================================
+# Sobol 지수
+# ======================================
+def saltelli_sample(n, k, seed=None, sampler='random'):
+    """A, B 와 AB_i (i 번째 열만 B 에서 가져온 A) 를 쌓은 ((k + 2) n, k) 행렬."""
+    base = _base_sample(n, 2 * k, seed, sampler)
+    A, B = base[:, :k], base[:, k:]
+    AB = np.repeat(A[np.newaxis], k, axis=0)
+    idx = np.arange(k)
+    AB[idx, :, idx] = B[:, idx].T
+    return np.concatenate([A, B, AB.reshape(k * n, k)])
+
+
+def _sobol_indices(fA, fB, fAB):
+    # fA, fB: (..., n), fAB: (..., k, n)  -- Saltelli (2010) 1차, Jansen 총 효과
+    var = np.var(np.concatenate([fA, fB], axis=-1), axis=-1)[..., np.newaxis]
+    S1 = np.mean(fB[..., np.newaxis, :] * (fAB - fA[..., np.newaxis, :]), axis=-1) / var
+    ST = 0.5 * np.mean((fA[..., np.newaxis, :] - fAB) ** 2, axis=-1) / var
+    return S1, ST
+
+
+def sobol(model, bounds=DEFAULT_BOUNDS, n=10_000, n_boot=200, conf=0.95, seed=None,
+          sampler='random', workers=None, names=FACTORS):
+    """1차(S1)/총 효과(ST) Sobol 지수와 부트스트랩 신뢰구간 반폭을 계산한다.
+
+    모델 평가 횟수는 n * (k + 2).
+    """
+    k = len(bounds)
+    u = saltelli_sample(n, k, seed, sampler)
+    y = evaluate(model, _scale(u, bounds), workers)
+    fA, fB, fAB = y[:n], y[n:2 * n], y[2 * n:].reshape(k, n)
+    S1, ST = _sobol_indices(fA, fB, fAB)
+
+    # 부트스트랩: 표본 번호를 재추출해 모든 반복을 한 번에 계산
+    idx = np.random.default_rng(seed).integers(0, n, (n_boot, n))
+    S1_b, ST_b = _sobol_indices(fA[idx], fB[idx], np.moveaxis(fAB[:, idx], 0, 1))
+    alpha = (1 - conf) / 2
+    lo, hi = np.quantile(S1_b, [alpha, 1 - alpha], axis=0)
+    lo_t, hi_t = np.quantile(ST_b, [alpha, 1 - alpha], axis=0)
+    return {'names': tuple(names[:k]), 'S1': S1, 'S1_conf': (hi - lo) / 2,
+            'ST': ST, 'ST_conf': (hi_t - lo_t) / 2, 'evaluations': len(y)}
+
+
+# ======================================
+# Morris elementary effects
+# ======================================
+def morris_sample(r, k, levels=4, seed=None):
+    """r 개 궤적 ((k + 1) r, k) 과 각 단계에서 바뀐 인자 번호/방향 부호."""
+    rng = np.random.default_rng(seed)
+    delta = levels / (2 * (levels - 1))
+    grid = np.arange(levels // 2) / (levels - 1)   # 시작점은 +delta 가 범위 안이 되는 격자
+    start = rng.choice(grid, (r, k))
+    sign = rng.choice([-1.0, 1.0], (r, k))
+    start = np.where(sign < 0, start + delta, start)
+    order = np.argsort(rng.random((r, k)), axis=1)
+
+    steps = np.zeros((r, k + 1, k))
+    steps[:, 1:, :] = np.eye(k)[order] * (sign[np.arange(r)[:, np.newaxis], order] * delta)[..., np.newaxis]
+    traj = start[:, np.newaxis, :] + np.cumsum(steps, axis=1)
+    return traj.reshape(r * (k + 1), k), order, sign, delta
+
+
+def morris(model, bounds=DEFAULT_BOUNDS, r=1_000, levels=4, seed=None, workers=None,
+           names=FACTORS):
+    """Morris 선별법: 인자별 elementary effect 의 mu, mu*, sigma (bounds 범위 기준)."""
+    k = len(bounds)
+    u, order, sign, delta = morris_sample(r, k, levels, seed)
+    y = evaluate(model, _scale(u, bounds), workers).reshape(r, k + 1)
+
+    diff = np.diff(y, axis=1)                                    # (r, k) 단계별 변화
+    s = sign[np.arange(r)[:, np.newaxis], order]
+    effects = np.empty((r, k))
+    effects[np.arange(r)[:, np.newaxis], order] = diff / (s * delta)
+    return {'names': tuple(names[:k]), 'mu': effects.mean(axis=0),
+            'mu_star': np.abs(effects).mean(axis=0), 'sigma': effects.std(axis=0, ddof=1),
+            'evaluations': y.size}
+
+
+if __name__ == '__main__':
+    from box_model import observed_population
+    from data_cache import load_table_2023
+
+    # ======================================
+    # 데이터 읽기 (2023년 데이터 포함)
+    # ======================================
+    table = load_table_2023()
+    history = np.vstack([table['Qin'], table['Qout'], table['P'], table['D']]).astype(float)
+    new_dC = observed_population(table['male'], table['female'], *history)
+
+    model = partial(forecast_error, history=history, observed=new_dC)
+    result = sobol(model, n=20_000, seed=0)
+    print(f"Sobol 지수 (모델 평가 {result['evaluations']:,}회)")
+    for name, s1, c1, st, ct in zip(result['names'], result['S1'], result['S1_conf'],
+                                    result['ST'], result['ST_conf']):
+        print(f"{name:>6}: S1 = {s1:6.3f} ± {c1:.3f}, ST = {st:6.3f} ± {ct:.3f}")
+
+    result = morris(model, r=2_000, seed=0)
+    print(f"\nMorris (모델 평가 {result['evaluations']:,}회)")
+    for name, mu_star, sigma in zip(result['names'], result['mu_star'], result['sigma']):
+        print(f"{name:>6}: mu* = {mu_star:8.3f}, sigma = {sigma:8.3f}")
@@ -0,0 +1,238 @@
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from box_model import observed_population
+from forecasters import FORECASTERS, MIN_YEARS, forecast
+
+# ======================================
+# 로컬 예측 서비스 (asyncio HTTP)
+# ======================================
+# 예측 하나마다 Python 시작, CSV 읽기, 적합을 반복하지 않도록 자료와 예측 경로를 메모리에
+# 올려 둔 채 localhost 에서 질의를 받는다.
+#
+#     python service.py --port 8765 --until 2050
+#     GET /population?region=서울&year=2030&scenario=trend
+#     GET /population?region=0&year=2030&scenario=damped&qin=1.05&p=0.9&c0=1.0
+#     GET /meta
+#
+# 시나리오는 흐름 예측 방식(forecasters.FORECASTERS)이고, qin/qout/p/d/c0 는 해당 흐름과
+# 초기 인구수에 곱하는 배율이다 (기본 1). 박스 모델은 선형이므로 시작할 때 흐름별 누적합
+#     cum[r, s, f, t] = 부호_f * Σ_{k<t} flux[r, s, f, k]
+# 를 한 번 계산해 두면 인구수는 C0 * c0 + Σ_f 배율_f * cum[r, s, f, t] 가 된다.
+#
+# 동시에 들어온 질의는 큐에 모았다가 max_delay 초 안에 도착한 것까지 한 번의 einsum 으로
+# 계산한다 (WarmModel.evaluate).
+
+SIGNS = np.array([1.0, -1.0, 1.0, -1.0])  # Qin - Qout + P - D
+SCALES = ('qin', 'qout', 'p', 'd')
+
+
+class WarmModel:
+    def __init__(self, years, fluxes, C0, regions, until, scenarios=tuple(FORECASTERS)):
+        """fluxes (R, 4, years), C0 (R,) 로 until 년까지의 시나리오별 누적 흐름을 만든다."""
+        years = np.asarray(years, dtype=np.int64)
+        fluxes = np.asarray(fluxes, dtype=float)
+        self.regions = [str(r) for r in regions]
+        self.scenarios = [s for s in scenarios if len(years) >= MIN_YEARS.get(s, 3)]
+        self.C0 = np.asarray(C0, dtype=float).reshape(len(self.regions))
+        self.years = np.arange(years[0], max(until, years[-1]) + 1)
+
+        future_years = self.years[len(years):]
+        paths = []
+        for scenario in self.scenarios:
+            if len(future_years):
+                future = np.maximum(forecast(scenario, fluxes, years, future_years), 0.0)
+                paths.append(np.concatenate([fluxes, future], axis=-1))
+            else:
+                paths.append(fluxes)
+        flux = np.stack(paths, axis=1) * SIGNS[:, np.newaxis]          # (R, S, 4, T)
+        self.cum = np.zeros(flux.shape)
+        np.cumsum(flux[..., :-1], axis=-1, out=self.cum[..., 1:])
+        self.last_observed = int(years[-1])
+
+    def lookup(self, region, year, scenario):
+        """질의 값을 배열 번호로 바꾼다. 잘못된 값은 ValueError."""
+        if region.isdigit() and int(region) < len(self.regions):
+            r = int(region)
+        elif region in self.regions:
+            r = self.regions.index(region)
+        else:
+            raise ValueError(f"알 수 없는 지역: {region}")
+        if scenario not in self.scenarios:
+            raise ValueError(f"알 수 없는 시나리오: {scenario} ({', '.join(self.scenarios)})")
+        t = int(year) - int(self.years[0])
+        if not 0 <= t < len(self.years):
+            raise ValueError(f"연도 범위 밖: {year} ({self.years[0]}~{self.years[-1]})")
+        return r, self.scenarios.index(scenario), t
+
+    def evaluate(self, r, s, t, scales, c0_scale):
+        """질의 N 개를 한 번에 계산한다. r, s, t: (N,), scales: (N, 4), c0_scale: (N,)."""
+        return self.C0[r] * c0_scale + np.einsum('nf,nf->n', self.cum[r, s, :, t], scales)
+
+
+# ======================================
+# 질의 모으기
+# ======================================
+class Batcher:
+    def __init__(self, model, max_delay=0.001, max_batch=4096):
+        self.model = model
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self.queries = 0
+
+    async def submit(self, query):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((query, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self.queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(items) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            while len(items) < self.max_batch and not self.queue.empty():
+                items.append(self.queue.get_nowait())
+
+            try:
+                query = np.array([q for q, _ in items], dtype=float)       # (N, 8)
+                idx = query[:, :3].astype(np.int64)
+                values = self.model.evaluate(idx[:, 0], idx[:, 1], idx[:, 2], query[:, 3:7], query[:, 7])
+            except Exception as e:
+                # 한 묶음이 실패해도 기다리는 질의에 오류를 돌려주고 계속 받는다
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), value in zip(items, values):
+                if not future.done():
+                    future.set_result(float(value))
+            self.batches += 1
+            self.queries += len(items)
+
+
+# ======================================
+# HTTP
+# ======================================
+def _response(status, body, keep_alive):
+    payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+    reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error'}.get(status, 'Error')
+    head = (f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(payload)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode('ascii') + payload
+
+
+async def _route(batcher, target):
+    model = batcher.model
+    url = urlsplit(target)
+    params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+    if url.path == '/population':
+        try:
+            r, s, t = model.lookup(params.get('region', '0'), params['year'],
+                                   params.get('scenario', model.scenarios[0]))
+            scales = [float(params.get(name, 1.0)) for name in SCALES]
+            c0 = float(params.get('c0', 1.0))
+            if not np.all(np.isfinite(scales + [c0])):
+                raise ValueError("배율은 유한한 수여야 합니다")
+        except KeyError as e:
+            return 400, {'error': f"필수 인자 없음: {e.args[0]}"}
+        except ValueError as e:
+            return 400, {'error': str(e)}
+        try:
+            value = await batcher.submit((r, s, t, *scales, c0))
+        except Exception as e:
+            return 500, {'error': f"계산 실패: {e}"}
+        return 200, {'region': model.regions[r], 'year': int(model.years[t]), 'scenario': model.scenarios[s],
+                     'observed': bool(model.years[t] <= model.last_observed), 'population': value}
+    if url.path == '/meta':
+        return 200, {'regions': model.regions, 'scenarios': model.scenarios,
+                     'years': [int(model.years[0]), int(model.years[-1])], 'last_observed': model.last_observed}
+    if url.path == '/health':
+        return 200, {'status': 'ok', 'batches': batcher.batches, 'queries': batcher.queries}
+    return 404, {'error': f"없는 경로: {url.path}"}
+
+
+async def handle(batcher, reader, writer):
+    try:
+        while True:
+            request = await reader.readuntil(b'\r\n\r\n')
+            lines = request.decode('latin-1').split('\r\n')
+            method, target, version = lines[0].split(' ', 2)
+            headers = {k.strip().lower(): v.strip() for k, v in
+                       (line.split(':', 1) for line in lines[1:] if ':' in line)}
+            if int(headers.get('content-length', 0)):
+                await reader.readexactly(int(headers['content-length']))   # 본문은 쓰지 않음
+            keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+            # 한글 지역 이름은 퍼센트 인코딩으로 오지만 그대로 UTF-8 로 와도 받아 줌
+            target = target.encode('latin-1').decode('utf-8', 'replace')
+            if method != 'GET':
+                status, body = 400, {'error': "GET 만 지원합니다"}
+            else:
+                status, body = await _route(batcher, target)
+            writer.write(_response(status, body, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(model, host='127.0.0.1', port=8765, max_delay=0.001):
+    batcher = Batcher(model, max_delay)
+    worker = asyncio.create_task(batcher.run())
+    server = await asyncio.start_server(lambda r, w: handle(batcher, r, w), host, port)
+    print(f"http://{host}:{port} 대기 중 (지역 {len(model.regions)}, 시나리오 {model.scenarios}, "
+          f"{model.years[0]}~{model.years[-1]}년)", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        worker.cancel()
+
+
+def load_model(path, until, region="서울"):
+    """CSV (data_cache) 에서 한 지역의 WarmModel 을 만든다. C0 는 첫 해의 재구성 인구수."""
+    from data_cache import load_table
+
+    table = load_table(path)
+    fluxes = np.vstack([table['Qin'], table['Qout'], table['P'], table['D']]).astype(float)
+    new_dC = observed_population(table['male'], table['female'], *fluxes)
+    return WarmModel(table['year'], fluxes[np.newaxis], new_dC[:1], [region], until)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="박스 모델 예측 서비스 (localhost)")
+    parser.add_argument('--data', default="BoxBodelData.csv", help="입력 CSV (EUC-KR)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--until', type=int, default=2050, help="미리 계산할 마지막 연도")
+    parser.add_argument('--max-delay', type=float, default=0.001, help="질의를 모으는 최대 대기 시간 (초)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    model = load_model(args.data, args.until)
+    print(f"모델 준비: {(time.perf_counter() - start) * 1000:.1f} ms", flush=True)
+    try:
+        asyncio.run(serve(model, args.host, args.port, args.max_delay))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
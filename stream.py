@@ -0,0 +1,101 @@
+import numpy as np
+
+from box_model import net_flux, observed_population, simulate
+
+# ======================================
+# 관측 자료 스트리밍 추가
+# ======================================
+# 스크립트들은 새 연도를 df_2023 같은 한 줄짜리 DataFrame 으로 만들어 pd.concat 으로
+# 전체 표를 복사한 뒤 2012년부터 다시 적분했다. 여기서는 미리 할당한 배열에 관측값을
+# 이어 쓰고(가득 차면 용량을 두 배로 늘림), 모델 인구수도 마지막 해에서 한 스텝만 진행한다.
+# 따라서 한 건 추가 비용은 (상환) O(1) 이다.
+#
+# regions 를 주면 한 건이 (regions,) 벡터인 지역별 자료를 같은 방식으로 다룬다.
+
+COLUMNS = ('Qin', 'Qout', 'P', 'D', 'male', 'female')
+
+
+class StreamingModel:
+    def __init__(self, C0, regions=None, capacity=64, dt=1, start_year=None):
+        self.C0 = C0
+        self.dt = dt
+        self.start_year = start_year
+        self._shape = () if regions is None else (regions,)
+        self._n = 0
+        self._data = {name: np.full((capacity,) + self._shape, np.nan) for name in COLUMNS}
+        self._dC = np.empty((capacity,) + self._shape)
+
+    def __len__(self):
+        return self._n
+
+    def _reserve(self, n):
+        capacity = len(self._dC)
+        if n <= capacity:
+            return
+        capacity = max(capacity, 1)   # capacity=0 으로 만든 경우에도 두 배씩 늘어나도록
+        while capacity < n:
+            capacity *= 2
+        for name, values in self._data.items():
+            grown = np.full((capacity,) + self._shape, np.nan)
+            grown[:self._n] = values[:self._n]
+            self._data[name] = grown
+        grown = np.empty((capacity,) + self._shape)
+        grown[:self._n] = self._dC[:self._n]
+        self._dC = grown
+
+    def append(self, Qin, Qout, P, D, male=np.nan, female=np.nan):
+        """한 해(또는 한 기간)의 관측값을 추가하고 그 해의 모델 인구수를 반환한다."""
+        n = self._n
+        self._reserve(n + 1)
+        row = dict(Qin=Qin, Qout=Qout, P=P, D=D, male=male, female=female)
+        for name, value in row.items():
+            self._data[name][n] = value
+
+        if n == 0:
+            self._dC[0] = self.C0
+        else:
+            # 직전 해의 흐름만으로 한 스텝 진행
+            prev = n - 1
+            flux = net_flux(self._data['Qin'][prev], self._data['Qout'][prev],
+                            self._data['P'][prev], self._data['D'][prev])
+            self._dC[n] = self._dC[prev] + flux * self.dt
+        self._n = n + 1
+        return self._dC[n]
+
+    def extend(self, Qin, Qout, P, D, male=np.nan, female=np.nan):
+        """여러 해의 관측값을 한꺼번에 추가한다 (마지막 축이 아닌 첫 축이 연도)."""
+        Qin = np.asarray(Qin, dtype=float)
+        k = len(Qin)
+        if k == 0:
+            return
+        n = self._n
+        self._reserve(n + k)
+        row = dict(Qin=Qin, Qout=Qout, P=P, D=D, male=male, female=female)
+        for name, value in row.items():
+            self._data[name][n:n + k] = value
+
+        # 직전 해부터 새 자료 끝까지를 simulate() 한 번으로 이어서 적분
+        lo = max(n - 1, 0)
+        start = self.C0 if n == 0 else self._dC[lo]
+        fluxes = [np.moveaxis(self._data[name][lo:n + k], 0, -1) for name in ('Qin', 'Qout', 'P', 'D')]
+        self._dC[lo:n + k] = np.moveaxis(simulate(start, *fluxes, dt=self.dt), -1, 0)
+        self._n = n + k
+
+    def __getitem__(self, name):
+        """저장된 관측 컬럼 (복사 없는 뷰)."""
+        return self._data[name][:self._n]
+
+    @property
+    def dC(self):
+        return self._dC[:self._n]
+
+    @property
+    def observed(self):
+        """실제 인구수에서 그 해의 흐름을 되돌린 값 (스크립트의 new_dC)."""
+        return observed_population(self['male'], self['female'], self['Qin'], self['Qout'],
+                                   self['P'], self['D'])
+
+    @property
+    def years(self):
+        start = 0 if self.start_year is None else self.start_year
+        return np.arange(start, start + self._n)
@@ -0,0 +1,148 @@
+import numpy as np
+
+from box_model import net_flux
+
+# ======================================
+# 1년보다 짧은 시간 간격의 적분
+# ======================================
+# 241020_1.py 에는 "dt 1년 이하는 의미 없음" 이라고 되어 있다. 흐름 자료가 연간 합계이기
+# 때문인데, 여기서는 연간 합계를 연속적인 비율 r(t) (명/년) 로 재구성해서 월/일 단위로
+# 적분한다. 어떤 재구성이든 각 해의 적분값이 그 해 합계와 같으므로, 정수 연도 시점의
+# 인구수는 연 단위 모델(box_model.simulate)과 일치한다.
+#
+#   kind='constant'  각 해 동안 일정한 비율 (계단 함수)
+#   kind='linear'    해 k 의 중간점을 기준으로 기울기를 갖는 선형 비율
+#                    r(t) = A_k + s_k (t - k - 0.5), s_k = (A_{k+1} - A_{k-1}) / 2
+#                    기울기 항은 해 안에서 적분하면 0 이므로 연간 합계가 보존된다.
+#
+# 적분 방법: 'euler', 'rk4', 'adaptive' (Bogacki-Shampine 2(3) 단계 크기 자동 조절).
+# rhs 를 주지 않으면 우변이 시간에만 의존하고 비율은 구간 안에서 선형이므로, 방법과 관계없이
+# 구간마다 중간점 값 x 간격 (선형 비율의 정확한 적분) 을 누적한다.
+# rhs 를 준 일반 적분에서는 위 일치가 성립하지 않는다 (Euler 는 1차 오차가 남음).
+# 시간 t 는 첫 해 시작을 0 으로 하는 연 단위이며, 시나리오 축은 앞쪽 축이다.
+
+STEPS = {'monthly': 12, 'daily': 365}
+
+
+def _slopes(annual):
+    s = np.empty_like(annual)
+    if annual.shape[-1] == 1:
+        s[...] = 0.0
+        return s
+    s[..., 1:-1] = (annual[..., 2:] - annual[..., :-2]) / 2
+    s[..., 0] = annual[..., 1] - annual[..., 0]
+    s[..., -1] = annual[..., -1] - annual[..., -2]
+    return s
+
+
+def reconstruct(annual, kind='linear'):
+    """연간 합계 (..., years) 로부터 비율 함수 rate(t, year) 를 만든다.
+
+    year 는 t 가 속한 해의 번호이다. 해 경계(정수 t)에서는 비율이 불연속이므로
+    적분 구간이 속한 해를 명시적으로 넘긴다. 생략하면 floor(t) 를 쓴다.
+    """
+    if kind not in ('linear', 'constant'):
+        raise ValueError(f"알 수 없는 재구성 방식: {kind}")
+    annual = np.asarray(annual, dtype=float)
+    years = annual.shape[-1]
+    slopes = _slopes(annual) if kind == 'linear' else np.zeros_like(annual)
+
+    def rate(t, year=None):
+        t = np.asarray(t, dtype=float)
+        k = np.floor(t) if year is None else np.asarray(year)
+        k = np.clip(k.astype(np.int64), 0, years - 1)
+        return annual[..., k] + slopes[..., k] * (t - k - 0.5)
+    return rate
+
+
+def time_grid(years, steps_per_year):
+    steps_per_year = STEPS.get(steps_per_year, steps_per_year)
+    return np.arange(years * steps_per_year + 1) / steps_per_year
+
+
+def _interval_years(t):
+    # 각 적분 구간이 속한 해 (구간 중간점 기준)
+    return np.floor((t[:-1] + t[1:]) / 2).astype(np.int64)
+
+
+def _quadrature(C0, rate, t):
+    # 우변이 시간에만 의존하면 적분은 구간별 적분값의 누적합이 된다 (반복문 없음).
+    # 구간은 해 경계를 넘지 않고 그 안에서 비율이 선형이므로 중간점 규칙이 정확하다.
+    h = np.diff(t)
+    inc = rate(t[:-1] + h / 2, _interval_years(t)) * h
+    C0 = np.asarray(C0, dtype=float)
+    shape = np.broadcast_shapes(inc.shape[:-1], C0.shape) + t.shape
+    C = np.empty(shape)
+    C[..., 0] = C0
+    np.cumsum(np.broadcast_to(inc, shape[:-1] + inc.shape[-1:]), axis=-1, out=C[..., 1:])
+    C[..., 1:] += C0[..., np.newaxis]
+    return C
+
+
+def _step(rhs, t, C, h, method):
+    if method == 'euler':
+        return C + h * rhs(t, C)
+    k1 = rhs(t, C)
+    k2 = rhs(t + h / 2, C + h / 2 * k1)
+    k3 = rhs(t + h / 2, C + h / 2 * k2)
+    k4 = rhs(t + h, C + h * k3)
+    return C + h / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+
+
+def _adaptive(rhs, C, t0, t1, h, rtol, atol):
+    # Bogacki-Shampine 2(3): 모든 시나리오에 공통인 단계 크기를 가장 나쁜 오차로 조절
+    t = t0
+    k1 = rhs(t, C)
+    while t < t1:
+        h = min(h, t1 - t)
+        k2 = rhs(t + h / 2, C + h / 2 * k1)
+        k3 = rhs(t + 3 * h / 4, C + 3 * h / 4 * k2)
+        new = C + h * (2 * k1 + 3 * k2 + 4 * k3) / 9
+        k4 = rhs(t + h, new)
+        err = h * (-5 * k1 / 72 + k2 / 12 + k3 / 9 - k4 / 8)
+        scale = atol + rtol * np.maximum(np.abs(C), np.abs(new))
+        norm = np.sqrt(np.mean((err / scale) ** 2)) if np.size(err) else 0.0
+        if norm <= 1.0:
+            t, C, k1 = t + h, new, k4
+        h *= min(5.0, max(0.2, 0.9 * (norm + 1e-16) ** (-1 / 3)))
+    return C, h
+
+
+def integrate(C0, rhs, t, method='rk4', rtol=1e-8, atol=1e-3):
+    """일반 우변 rhs(t, C, year) 를 출력 시점 t 에서 적분한다. 반환값은 (..., len(t)).
+
+    year 는 현재 출력 구간이 속한 해이며, 출력 구간은 해 경계를 넘지 않아야 한다.
+    """
+    C = np.array(C0, dtype=float)
+    out = np.empty(C.shape + (len(t),))
+    out[..., 0] = C
+    h = t[1] - t[0] if len(t) > 1 else 1.0
+    for i, year in enumerate(_interval_years(t), start=1):
+        func = lambda time, state: rhs(time, state, year)
+        if method == 'adaptive':
+            C, h = _adaptive(func, C, t[i - 1], t[i], h, rtol, atol)
+        else:
+            C = _step(func, t[i - 1], C, t[i] - t[i - 1], method)
+        out[..., i] = C
+    return out
+
+
+def simulate_subannual(C0, Qin, Qout, P, D, steps_per_year=12, kind='linear', method='rk4',
+                       rhs=None, **tolerances):
+    """연간 Qin/Qout/P/D 를 월(12)/일(365) 등 단위로 나누어 적분한다.
+
+    rhs 를 주면 우변을 rhs(t, C, r) 로 바꿀 수 있다. r 은 t 에서 재구성한 순유입 비율이다
+    (예: 인구에 비례하는 보정). 반환값은 (시점 배열, (..., 시점 수) 인구수) 이며
+    정수 시점 k 는 k 번째 해의 시작이며, simulate() 와 달리 마지막 해의 끝 시점도 포함한다.
+    """
+    annual = net_flux(Qin, Qout, P, D)
+    rate = reconstruct(annual, kind)
+    t = time_grid(annual.shape[-1], steps_per_year)
+    if rhs is None and method in ('euler', 'rk4'):
+        return t, _quadrature(C0, rate, t)
+    if rhs is None:
+        func = lambda time, C, year: rate(time, year)
+    else:
+        func = lambda time, C, year: rhs(time, C, rate(time, year))
+    C0 = np.broadcast_to(np.asarray(C0, dtype=float), np.broadcast_shapes(annual.shape[:-1], np.shape(C0)))
+    return t, integrate(C0, func, t, method, **tolerances)
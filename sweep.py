@@ -0,0 +1,215 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import profiling
+from box_model import observed_population, simulate
+from forecasters import FORECASTERS, MIN_YEARS, forecast, recent_mean
+
+# ======================================
+# 시나리오 격자 일괄 실행
+# ======================================
+# 11개 스크립트는 사실상 (예측 방식, C0 정의, 보정 구간, 예측 기간) 을 손으로 바꿔 가며
+# 돌린 것이다. sweep() 은 격자 명세의 데카르트 곱을 프로세스 풀에 나누어 실행하고
+# 결과를 표(DataFrame) 하나로 모은다.
+#
+# - 입력 배열은 한 번만 읽어 공유 메모리 블록 하나에 올린다. 작업자는 initializer 에서
+#   그 블록에 붙어 복사 없이 numpy 뷰로 읽는다 (작업마다 입력을 pickle 하지 않음).
+# - 작업은 격자 점 chunk_size 개씩 묶어 보낸다.
+#
+# 격자 점 하나의 계산:
+#   보정 구간 [start, end] 의 관측 흐름으로 end 이후 horizon 년의 흐름을 예측하고
+#   (forecasters.FORECASTERS: mean 은 최근 window 년 평균), start 년의 C0 에서 end + horizon 년까지
+#   적분한 뒤 실제 인구수(new_dC)와 비교한다. 관측이 없는 해의 오차는 NaN 이다.
+
+INPUTS = ('year', 'Qin', 'Qout', 'P', 'D', 'male', 'female')
+
+# C0 정의: 숫자를 주면 그 값을 그대로 쓴다
+C0_DEFINITIONS = {
+    'reconstructed': lambda d, i: d['new_dC'][i],          # 남 + 여 - P + D - Qin + Qout (20241027_6/7)
+    'resident': lambda d, i: d['male'][i] + d['female'][i],  # 주민등록 인구수
+}
+
+DEFAULT_GRID = {
+    'method': tuple(FORECASTERS),
+    'c0': ('reconstructed', 'resident'),
+    'start': None,      # None 이면 데이터의 모든 연도
+    'end': None,
+    'horizon': (1, 2),
+    'window': (3,),
+}
+
+COLUMNS = ('method', 'c0', 'start', 'end', 'horizon', 'window', 'C0', 'fit_RMSE', 'fit_MAPE',
+           'forecast', 'observed', 'error', 'error_rate', 'forecast_MAPE')
+
+
+# ======================================
+# 공유 메모리 입력
+# ======================================
+class SharedInputs:
+    """이름 -> 배열 사전을 공유 메모리 블록 하나에 올린다. with 문이 끝나면 해제된다."""
+
+    def __init__(self, arrays):
+        arrays = {name: np.ascontiguousarray(value) for name, value in arrays.items()}
+        self.layout = []
+        offset = 0
+        for name, value in arrays.items():
+            offset = -(-offset // 64) * 64   # 배열마다 64바이트 정렬
+            self.layout.append((name, offset, value.shape, value.dtype.str))
+            offset += value.nbytes
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for (name, off, shape, dtype), value in zip(self.layout, arrays.values()):
+            np.ndarray(shape, dtype, buffer=self.shm.buf, offset=off)[...] = value
+
+    @property
+    def spec(self):
+        return self.shm.name, self.layout
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def attach(name, layout):
+    """공유 메모리 블록에 붙어 (블록, 이름 -> 읽기 전용 뷰) 를 돌려준다."""
+    shm = shared_memory.SharedMemory(name=name)
+    views = {}
+    for key, off, shape, dtype in layout:
+        view = np.ndarray(shape, dtype, buffer=shm.buf, offset=off)
+        view.flags.writeable = False
+        views[key] = view
+    return shm, views
+
+
+_SHM = None
+_DATA = None
+
+
+def _init_worker(name, layout):
+    global _SHM, _DATA
+    _SHM, _DATA = attach(name, layout)
+
+
+# ======================================
+# 격자
+# ======================================
+def grid_points(grid, years):
+    """격자 명세의 데카르트 곱 중 계산 가능한 점 (method, c0, start, end, horizon, window) 목록."""
+    spec = dict(DEFAULT_GRID, **grid)
+    years = [int(y) for y in years]
+    spec['start'] = spec['start'] or years
+    spec['end'] = spec['end'] or years
+    points = []
+    for method, c0, start, end, horizon, window in itertools.product(
+            spec['method'], spec['c0'], spec['start'], spec['end'], spec['horizon'], spec['window']):
+        if start not in years or end not in years:
+            continue
+        # 평균은 window 년, 나머지는 예측기별 최소 연도 이상의 보정 구간이 필요
+        if end - start + 1 < (window if method == 'mean' else MIN_YEARS[method]):
+            continue
+        points.append((method, c0, start, end, horizon, window))
+    return points
+
+
+def evaluate_point(data, method, c0, start, end, horizon, window):
+    """격자 점 하나의 결과 행 (COLUMNS 순서의 튜플)."""
+    years = data['year']
+    i0, i1 = np.searchsorted(years, [start, end])
+    fluxes = data['fluxes'][:, i0:i1 + 1]
+    future_years = np.arange(end + 1, end + 1 + horizon)
+
+    if method == 'mean':
+        future = recent_mean(fluxes, years[i0:i1 + 1], future_years, window)
+    else:
+        future = forecast(method, fluxes, years[i0:i1 + 1], future_years)
+
+    C0 = float(C0_DEFINITIONS[c0](data, i0) if isinstance(c0, str) else c0)
+    dC = simulate(C0, *np.hstack([fluxes, future]))
+
+    new_dC = data['new_dC']
+    fit_err = dC[:i1 - i0 + 1] - new_dC[i0:i1 + 1]
+    fit_rmse = np.sqrt(np.mean(fit_err ** 2))
+    fit_mape = np.mean(np.abs(fit_err) / new_dC[i0:i1 + 1]) * 100
+
+    # 예측 연도 중 관측이 있는 해만 비교
+    avail = min(horizon, len(years) - 1 - i1)
+    observed = new_dC[i1 + 1:i1 + 1 + avail]
+    pred = dC[i1 - i0 + 1:]
+    if avail == horizon:
+        error = pred[-1] - observed[-1]
+        error_rate = error / observed[-1] * 100
+    else:
+        error = error_rate = np.nan
+    forecast_mape = np.mean(np.abs(pred[:avail] - observed) / observed) * 100 if avail else np.nan
+    return (method, c0, start, end, horizon, window, C0, fit_rmse, fit_mape, pred[-1],
+            observed[-1] if avail == horizon else np.nan, error, error_rate, forecast_mape)
+
+
+def _run_chunk(points):
+    return [evaluate_point(_DATA, *p) for p in points]
+
+
+def prepare_inputs(table):
+    """CSV 컬럼 사전(data_cache.load_table 등)에서 공유할 배열을 만든다."""
+    missing = [name for name in INPUTS if name not in table]
+    if missing:
+        raise KeyError(f"입력에 없는 컬럼: {', '.join(missing)}")
+    fluxes = np.vstack([table['Qin'], table['Qout'], table['P'], table['D']]).astype(float)
+    return {
+        'year': np.asarray(table['year'], dtype=np.int64),
+        'fluxes': fluxes,
+        'male': np.asarray(table['male'], dtype=float),
+        'female': np.asarray(table['female'], dtype=float),
+        'new_dC': observed_population(table['male'], table['female'], *fluxes),
+    }
+
+
+def sweep(table, grid=None, workers=None, chunk_size=64):
+    """격자 명세 grid 의 모든 점을 실행해 결과 DataFrame 을 돌려준다.
+
+    table: 'year', 'Qin', 'Qout', 'P', 'D', 'male', 'female' 컬럼 사전
+    grid: DEFAULT_GRID 와 같은 키의 사전 (빠진 키는 기본값)
+    """
+    import pandas as pd
+
+    data = prepare_inputs(table)
+    points = grid_points(grid or {}, data['year'])
+    chunks = [points[lo:lo + chunk_size] for lo in range(0, len(points), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(chunks) <= 1:
+        with profiling.stage('sweep.evaluate', points=len(points)):
+            rows = [evaluate_point(data, *p) for p in points]
+    else:
+        with SharedInputs(data) as shared, \
+                ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                    initargs=shared.spec) as pool:
+            results = profiling.gather(pool.map(profiling.task(_run_chunk), chunks))
+            rows = [row for chunk in results for row in chunk]
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+
+if __name__ == '__main__':
+    import time
+
+    from data_cache import load_table_2023
+
+    # ======================================
+    # 데이터 읽기 (2023년 데이터 포함)
+    # ======================================
+    table = load_table_2023()
+
+    start = time.perf_counter()
+    result = sweep(table, {'horizon': (1, 2, 3), 'c0': ('reconstructed', 'resident', 10246565)})
+    print(f"격자 점 {len(result)}개, {time.perf_counter() - start:.2f}초")
+
+    scored = result.dropna(subset=['error_rate'])
+    best = scored.loc[scored['error_rate'].abs().groupby([scored['method'], scored['horizon']]).idxmin()]
+    print(best[['method', 'c0', 'start', 'end', 'horizon', 'forecast', 'observed', 'error_rate']]
+          .to_string(index=False))
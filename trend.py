@@ -0,0 +1,30 @@
+import numpy as np
+
+# ======================================
+# 선형 추세 예측 (일괄 처리 버전)
+# ======================================
+# 20241027_4.py / 20241027_5.py 의 predict_future_values 는 Qin, Qout, P, D 마다
+# sklearn LinearRegression 을 새로 만들었다. 여기서는 모든 계열이 같은 연도 축을 쓰므로
+# 중심화한 연도 x 에 대한 최소제곱 해
+#     slope = Σ (x - x̄) y / Σ (x - x̄)²,  intercept = ȳ - slope * x̄
+# 를 행렬 곱 한 번으로 모든 계열에 대해 구한다.
+#
+# y_values 는 (years,) 또는 (..., years) 배열 (예: (지역 수, 4, years)).
+
+
+def fit_trend(years, y_values):
+    """모든 계열의 (intercept, slope) 를 한 번에 구한다. 각각 (...) 모양."""
+    x = np.asarray(years, dtype=float).ravel()
+    y = np.asarray(y_values, dtype=float)
+    x_mean = x.mean()
+    xc = x - x_mean
+    slope = (y @ xc) / (xc @ xc)
+    intercept = y.mean(axis=-1) - slope * x_mean
+    return intercept, slope
+
+
+def predict_future_values(y_values, years, future_years):
+    """선형 추세로 future_years 의 값을 예측한다. 반환값은 (..., len(future_years))."""
+    intercept, slope = fit_trend(years, y_values)
+    future = np.asarray(future_years, dtype=float).ravel()
+    return intercept[..., np.newaxis] + slope[..., np.newaxis] * future